@@ -2,12 +2,50 @@
 # This file is covered by the GNU General Public License.
 # See the file COPYING for more details.
 
-import sys
+import argparse
+import json
 import os
-from crowdin_api import CrowdinClient
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+if TYPE_CHECKING:
+	# Imported when creating a client only, so local analysis needs no network library.
+	from crowdin_api import CrowdinClient
+
+# Items per page of Crowdin API lists
+PAGE_LIMIT = 100
+# Concurrent requests to the Crowdin API in batch mode, well below its limit of 20 per account
+MAX_REQUESTS = 4
+LANGUAGE_MAPPINGS_PATH = Path(__file__).with_name("languageMappings.json")
+FILE_ID_CACHE_PATH = Path(tempfile.gettempdir()) / "crowdinFileIds.json"
+
+
+def getSourceTarget(fileNameToSearch: str) -> tuple[str, str]:
+	"""
+	:param fileNameToSearch: The local path or name of a translated file.
+	:return: The lowercase base name and extension of its source file on Crowdin.
+	"""
+	# Clean and prepare search patterns.
+	# Example: 'addon/locale/fr/LC_MESSAGES/myAddon.po' -> base_target: 'myAddon'.
+	baseTarget = fileNameToSearch.replace("\\", "/").split("/")[-1].rsplit(".", 1)[0].lower()
+	extTarget = fileNameToSearch.split(".")[-1].lower()
+	# On Crowdin, the source for a .po file is usually a .pot file.
+	searchExt = ".pot" if extTarget == "po" else f".{extTarget}"
+	return baseTarget, searchExt
+
+
+def matchesLanguage(langApi: str, langId: str) -> bool:
+	"""
+	Flexible matching (e.g., 'fr' will match 'fr' or 'fr-FR' from API).
+	Also handles underscore to dash conversion for Crowdin compatibility
+	"""
+	return langApi.lower().startswith(langId.lower().replace("_", "-"))
 
 
-def findFileId(client: CrowdinClient, projectId: int, baseTarget: str, searchExt: str) -> int | None:
+def findFileId(client: "CrowdinClient", projectId: int, baseTarget: str, searchExt: str) -> int | None:
 	"""
 	Iterates through all project files (using pagination) to find the ID of the source file matching the target name and extension.
 
@@ -60,17 +98,25 @@ def getScoreFromApi(fileNameToSearch: str, langId: str) -> float:
 		print("ERROR: Missing environment variables 'crowdinAuthToken' or 'CROWDIN_PROJECT_ID'.")
 		return 0.0
 
+	from crowdin_api import CrowdinClient
+
 	client = CrowdinClient(token=token)
 	projectId = int(projectIdEnv)
+	return getScore(client, projectId, fileNameToSearch, langId)
 
-	try:
-		# Clean and prepare search patterns.
-		# Example: 'addon/locale/fr/LC_MESSAGES/myAddon.po' -> base_target: 'myAddon'.
-		baseTarget = fileNameToSearch.replace("\\", "/").split("/")[-1].rsplit(".", 1)[0].lower()
-		extTarget = fileNameToSearch.split(".")[-1].lower()
 
-		# On Crowdin, the source for a .po file is usually a .pot file.
-		searchExt = ".pot" if extTarget == "po" else f".{extTarget}"
+def getScore(client: "CrowdinClient", projectId: int, fileNameToSearch: str, langId: str) -> float:
+	"""
+	Retrieves the translation progress score for a specific language and file, with a client already created.
+
+	:param client: The Crowdin API client instance.
+	:param projectId: The ID of the Crowdin project.
+	:param fileNameToSearch: The local path or name of the file to check.
+	:param langId: The language code (e.g., 'fr' or 'pt_BR').
+	:return: The translation ratio between 0.0 and 1.0.
+	"""
+	try:
+		baseTarget, searchExt = getSourceTarget(fileNameToSearch)
 
 		print(f"DEBUG: Searching for source file: {baseTarget}{searchExt}")
 
@@ -96,9 +142,7 @@ def getScoreFromApi(fileNameToSearch: str, langId: str) -> float:
 			for item in data:
 				langApi = item["data"]["languageId"]
 
-				# Flexible matching (e.g., 'fr' will match 'fr' or 'fr-FR' from API).
-				# Also handles underscore to dash conversion for Crowdin compatibility
-				if langApi.lower().startswith(langId.lower().replace("_", "-")):
+				if matchesLanguage(langApi, langId):
 					progress = float(item["data"]["translationProgress"])
 					return progress
 
@@ -116,9 +160,382 @@ def getScoreFromApi(fileNameToSearch: str, langId: str) -> float:
 		return 0.0
 
 
+class PoStats(NamedTuple):
+	"""Entries of a local .po file, header and obsolete entries excluded."""
+
+	path: str
+	translated: int
+	fuzzy: int
+	empty: int
+
+	@property
+	def total(self) -> int:
+		return self.translated + self.fuzzy + self.empty
+
+	@property
+	def progress(self) -> float:
+		"""Percentage of translated entries, as Crowdin reports it."""
+		return 100.0 * self.translated / self.total if self.total else 0.0
+
+
+def analysePo(path: str) -> PoStats:
+	"""
+	Counts translated, fuzzy and empty entries of a .po file, without network.
+	An entry with a plural form left empty is counted as empty.
+
+	:param path: Path of the .po file.
+	:return: The counts.
+	"""
+	counts = {"translated": 0, "fuzzy": 0, "empty": 0}
+	# state of the current entry: whether its msgid and each msgstr have text
+	section: str | None = None
+	hasContext = hasMsgid = fuzzy = False
+	filledMsgstrs: list[bool] = []
+
+	def countEntry():
+		if not hasMsgid and not hasContext:
+			# the header
+			return
+		if fuzzy:
+			counts["fuzzy"] += 1
+		elif all(filledMsgstrs):
+			counts["translated"] += 1
+		else:
+			counts["empty"] += 1
+
+	with open(path, encoding="utf-8", errors="replace") as f:
+		for line in f:
+			line = line.strip()
+			if not line or line.startswith("#~"):
+				# obsolete entries are left out
+				continue
+			keyword, _sep, value = line.partition(" ")
+			if section == "msgstr" and (line.startswith("#") or keyword in ("msgctxt", "msgid")):
+				countEntry()
+				section, hasContext, hasMsgid, fuzzy, filledMsgstrs = None, False, False, False, []
+			if line.startswith("#"):
+				fuzzy = fuzzy or (line.startswith("#,") and "fuzzy" in line)
+			elif keyword == "msgctxt":
+				section, hasContext = keyword, True
+			elif keyword == "msgid":
+				section, hasMsgid = keyword, value != '""'
+			elif keyword == "msgid_plural":
+				section = keyword
+			elif keyword.startswith("msgstr"):
+				section = "msgstr"
+				filledMsgstrs.append(value != '""')
+			elif section == "msgid":
+				# continuation of the current string
+				hasMsgid = hasMsgid or line != '""'
+			elif section == "msgstr":
+				filledMsgstrs[-1] = filledMsgstrs[-1] or line != '""'
+	if section == "msgstr":
+		countEntry()
+	return PoStats(path, **counts)
+
+
+def analyseLocales(localeDirs: list[str], workers: int | None = None) -> dict[str, list[PoStats]]:
+	"""
+	Analyses all .po files of all languages, across processes.
+
+	:param localeDirs: Directories with a subdirectory per language, like addon/locale.
+	:param workers: Processes to analyse with; by default, one per CPU.
+	:return: Stats of .po files by language, for every language directory even without .po files.
+	"""
+	statsByLang: dict[str, list[PoStats]] = {}
+	paths: list[tuple[str, str]] = []
+	for localeDir in localeDirs:
+		for langDir in sorted(Path(localeDir).iterdir()):
+			if langDir.is_dir():
+				statsByLang.setdefault(langDir.name, [])
+				paths.extend((langDir.name, str(po)) for po in sorted(langDir.rglob("*.po")))
+	workers = min(workers or os.cpu_count() or 1, len(paths))
+	if workers <= 1:
+		results = [analysePo(path) for _lang, path in paths]
+	else:
+		with ProcessPoolExecutor(workers) as executor:
+			results = list(executor.map(analysePo, [path for _lang, path in paths], chunksize=8))
+	for (lang, _path), stats in zip(paths, results):
+		statsByLang.setdefault(lang, []).append(stats)
+	return statsByLang
+
+
+def getCrowdinLanguage(lang: str, mappings: dict[str, str]) -> str:
+	"""Crowdin code of a local language, as crowdinSync.ps1 computes it."""
+	return mappings.get(lang) or lang.replace("_", "-")
+
+
+def loadFileIds(cachePath: Path, projectId: int) -> dict[str, int]:
+	"""
+	:return: Source file IDs of the project by target name, like myaddon.pot, as cached on disk.
+	"""
+	try:
+		with open(cachePath, encoding="utf-8") as f:
+			return json.load(f).get(str(projectId), {})
+	except (OSError, ValueError, AttributeError):
+		return {}
+
+
+def saveFileIds(cachePath: Path, projectId: int, fileIds: dict[str, int]):
+	try:
+		with open(cachePath, encoding="utf-8") as f:
+			cache = json.load(f)
+		if not isinstance(cache, dict):
+			cache = {}
+	except (OSError, ValueError):
+		cache = {}
+	cache[str(projectId)] = fileIds
+	with open(cachePath, "w", encoding="utf-8") as f:
+		json.dump(cache, f, indent="\t", sort_keys=True)
+
+
+def listSourceFiles(client: "CrowdinClient", projectId: int) -> dict[str, int]:
+	"""
+	Pages through all project files once.
+
+	:return: File IDs by lowercase path.
+	"""
+	files: dict[str, int] = {}
+	offset = 0
+	while True:
+		data = client.source_files.list_files(projectId=projectId, limit=PAGE_LIMIT, offset=offset)["data"]
+		for f in data:
+			files[f["data"]["path"].lower()] = f["data"]["id"]
+		if len(data) < PAGE_LIMIT:
+			return files
+		offset += PAGE_LIMIT
+
+
+def getFileIds(
+	client: "CrowdinClient",
+	projectId: int,
+	targets: list[str],
+	cachePath: Path | None,
+	refresh: bool = False,
+) -> dict[str, int | None]:
+	"""
+	Finds source file IDs from the disk cache, listing project files once for targets not cached.
+
+	:param targets: Target names, like myaddon.pot.
+	:param cachePath: Cache file, or None to not cache.
+	:param refresh: Whether to ignore cached IDs.
+	:return: File IDs by target, None for targets not found.
+	"""
+	fileIds = {} if refresh or cachePath is None else loadFileIds(cachePath, projectId)
+	missing = [target for target in targets if target not in fileIds]
+	if missing:
+		paths = listSourceFiles(client, projectId)
+		for target in missing:
+			# files are listed in project order, the first match wins as in findFileId
+			fileId = next((fileId for path, fileId in paths.items() if path.endswith(target)), None)
+			if fileId is not None:
+				fileIds[target] = fileId
+		if cachePath is not None:
+			saveFileIds(cachePath, projectId, fileIds)
+	return {target: fileIds.get(target) for target in targets}
+
+
+def getProgressPages(
+	client: "CrowdinClient",
+	projectId: int,
+	fileIds: list[int],
+	maxRequests: int = MAX_REQUESTS,
+) -> dict[int, list[dict[str, Any]]]:
+	"""
+	Fetches the progress of all languages for files, with at most maxRequests concurrent requests:
+	first pages of all files, then remaining pages of all files.
+
+	:return: Progress items in API order, by file ID.
+	"""
+
+	def getPage(fileId: int, offset: int) -> dict[str, Any]:
+		return client.translation_status.get_file_progress(
+			projectId=projectId,
+			fileId=fileId,
+			limit=PAGE_LIMIT,
+			offset=offset,
+		)
+
+	with ThreadPoolExecutor(maxRequests) as executor:
+		firstPages = list(executor.map(getPage, fileIds, [0] * len(fileIds)))
+		requests = [
+			(fileId, offset)
+			for fileId, page in zip(fileIds, firstPages)
+			for offset in range(PAGE_LIMIT, page["pagination"]["totalCount"], PAGE_LIMIT)
+		]
+		otherPages = list(executor.map(getPage, *zip(*requests))) if requests else []
+	items: dict[int, list[dict[str, Any]]] = {fileId: [] for fileId in fileIds}
+	for fileId, page in zip(fileIds, firstPages):
+		items[fileId].extend(item["data"] for item in page["data"])
+	for (fileId, _offset), page in zip(requests, otherPages):
+		items[fileId].extend(item["data"] for item in page["data"])
+	return items
+
+
+def getScoresFromApi(
+	client: "CrowdinClient",
+	projectId: int,
+	fileNames: list[str],
+	crowdinLangs: list[str],
+	cachePath: Path | None = FILE_ID_CACHE_PATH,
+	maxRequests: int = MAX_REQUESTS,
+) -> dict[str, dict[str, float]]:
+	"""
+	Retrieves translation progress of files for all languages at once.
+	If a cached file ID is no longer valid, file IDs are looked up again.
+
+	:param fileNames: Local paths or names of files, like myAddon.po or myAddon.xliff.
+	:param crowdinLangs: Crowdin language codes.
+	:return: Progress by file name, then by language, 0.0 if a file or language is not found.
+	"""
+	targets = {fileName: "".join(getSourceTarget(fileName)) for fileName in fileNames}
+	for refresh in (False, True):
+		fileIds = getFileIds(client, projectId, list(set(targets.values())), cachePath, refresh=refresh)
+		try:
+			pages = getProgressPages(
+				client,
+				projectId,
+				sorted({fileId for fileId in fileIds.values() if fileId is not None}),
+				maxRequests,
+			)
+			break
+		except Exception:
+			if refresh or cachePath is None:
+				raise
+			print("WARNING: Progress lookup failed, looking up file IDs again.", file=sys.stderr)
+	scores: dict[str, dict[str, float]] = {}
+	for fileName, target in targets.items():
+		items = pages.get(fileIds[target], [])
+		scores[fileName] = {
+			lang: next(
+				(
+					float(item["translationProgress"])
+					for item in items
+					if matchesLanguage(item["languageId"], lang)
+				),
+				0.0,
+			)
+			for lang in crowdinLangs
+		}
+	return scores
+
+
+def getScoresFromEnvironment(
+	fileNames: list[str],
+	crowdinLangs: list[str],
+	cachePath: Path | None,
+	maxRequests: int,
+) -> dict[str, dict[str, float]]:
+	"""
+	Retrieves translation progress of files for all languages at once, with a client created from environment.
+	As in the per language mode, errors are reported and give 0.0 scores.
+	"""
+	scores = {fileName: dict.fromkeys(crowdinLangs, 0.0) for fileName in fileNames}
+	token = os.environ.get("crowdinAuthToken")
+	projectIdEnv = os.environ.get("CROWDIN_PROJECT_ID")
+	if not token or not projectIdEnv:
+		print(
+			"ERROR: Missing environment variables 'crowdinAuthToken' or 'CROWDIN_PROJECT_ID'.",
+			file=sys.stderr,
+		)
+		return scores
+	from crowdin_api import CrowdinClient
+
+	try:
+		return getScoresFromApi(
+			CrowdinClient(token=token),
+			int(projectIdEnv),
+			fileNames,
+			crowdinLangs,
+			cachePath,
+			maxRequests,
+		)
+	except Exception as e:
+		print(f"API ERROR: {e}", file=sys.stderr)
+		return scores
+
+
+def batchMain(args: list[str]):
+	parser = argparse.ArgumentParser(
+		prog="checkTranslation.py --batch",
+		description="Compute translation completeness of all languages at once.",
+	)
+	parser.add_argument(
+		"localeDirs", nargs="+", help="directories with a subdirectory of .po files per language"
+	)
+	parser.add_argument("--api", action="store_true", help="also fetch progress of files from Crowdin")
+	parser.add_argument(
+		"--files",
+		nargs="+",
+		default=[],
+		help="files whose Crowdin progress is fetched, like myAddon.po myAddon.xliff",
+	)
+	parser.add_argument("--workers", type=int, help="processes analysing .po files, one per CPU if not given")
+	parser.add_argument("--max-requests", type=int, default=MAX_REQUESTS, help="concurrent Crowdin requests")
+	parser.add_argument(
+		"--cache", type=Path, default=FILE_ID_CACHE_PATH, help="file caching Crowdin file IDs"
+	)
+	parser.add_argument("--output", help="write JSON results to this file instead of printing a table")
+	options = parser.parse_args(args)
+
+	statsByLang = analyseLocales(options.localeDirs, options.workers)
+	with open(LANGUAGE_MAPPINGS_PATH, encoding="utf-8") as f:
+		mappings = json.load(f)
+	results: dict[str, dict[str, Any]] = {}
+	for lang, statsList in sorted(statsByLang.items()):
+		results[lang] = {
+			"crowdinLang": getCrowdinLanguage(lang, mappings),
+			"local": {
+				stats.path: {
+					"translated": stats.translated,
+					"fuzzy": stats.fuzzy,
+					"empty": stats.empty,
+					"progress": stats.progress,
+				}
+				for stats in statsList
+			},
+		}
+	if options.api:
+		scores = getScoresFromEnvironment(
+			options.files,
+			sorted({result["crowdinLang"] for result in results.values()}),
+			options.cache,
+			options.max_requests,
+		)
+		for result in results.values():
+			for fileName, scoresByLang in scores.items():
+				result[f"{getScoreLabel(fileName)}Score"] = scoresByLang[result["crowdinLang"]]
+	if options.output:
+		with open(options.output, "w", encoding="utf-8") as f:
+			json.dump(results, f, indent="\t", sort_keys=True)
+		return
+	for lang, result in results.items():
+		for path, stats in result["local"].items():
+			print(
+				f"{lang}: {stats['progress']:.1f}% ({stats['translated']} translated, "
+				f"{stats['fuzzy']} fuzzy, {stats['empty']} empty) {path}",
+			)
+		for key, score in result.items():
+			if key.endswith("Score"):
+				print(f"{lang}: {key}={score}")
+
+
+def getScoreLabel(fileName: str) -> str:
+	"""Identify extension to provide a specific score label."""
+	ext = fileName.lower().split(".")[-1]
+	if ext in ("md", "xliff"):
+		return ext
+	# Default to poScore for .po and other localization files.
+	return "po"
+
+
 def main():
+	if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+		batchMain(sys.argv[2:])
+		return
 	if len(sys.argv) < 3:
 		print("Usage: python checkTranslation.py <filePath> <langId>")
+		print("       python checkTranslation.py --batch <localeDir>... [--api --files <fileName>...]")
 		sys.exit(2)
 
 	input_file = sys.argv[1]
@@ -129,15 +546,7 @@ def main():
 	# Output formatted for capture by the PowerShell script.
 	print(f"translationRatio={score}")
 
-	# Identify extension to provide a specific score label.
-	ext = input_file.lower().split(".")[-1]
-	if ext == "md":
-		print(f"mdScore={score}")
-	elif ext == "xliff":
-		print(f"xliffScore={score}")
-	else:
-		# Default to poScore for .po and other localization files.
-		print(f"poScore={score}")
+	print(f"{getScoreLabel(input_file)}Score={score}")
 
 
 if __name__ == "__main__":
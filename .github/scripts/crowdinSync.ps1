@@ -72,6 +72,13 @@ New-Item -ItemType Directory -Force -Path addon/doc | Out-Null
 # Load language mappings for Crowdin API calls
 $languageMappings = Get-Content -Raw ".github/scripts/languageMappings.json" | ConvertFrom-Json
 
+# Evaluate remote scores of all languages at once:
+# the Crowdin file list is fetched once, file IDs are cached, and progress is queried concurrently.
+Write-Host "DEBUG: Evaluating remote PO and XLIFF scores of all languages..."
+$scoresFile = Join-Path ([System.IO.Path]::GetTempPath()) "$addonId-translationScores.json"
+uv run python .github/scripts/checkTranslation.py --batch "_addonL10n/$addonId" --api --files "$addonId.po" "$addonId.xliff" --output $scoresFile
+$remoteScores = Get-Content -Raw $scoresFile | ConvertFrom-Json
+
 foreach ($dir in Get-ChildItem -Path "_addonL10n/$addonId" -Directory) {
 
     $langCode = $dir.Name
@@ -111,13 +118,7 @@ foreach ($dir in Get-ChildItem -Path "_addonL10n/$addonId" -Directory) {
 
     if (Test-Path $remotePo) {
 
-        Write-Host "DEBUG: Evaluating Remote PO score..."
-
-        $res = uv run python .github/scripts/checkTranslation.py "$addonId.po" $crowdinLang
-
-        $scorePo = [double](
-            ($res | Select-String "poScore=").ToString().Split("=")[1]
-        )
+        $scorePo = [double]$remoteScores."$langCode".poScore
 
         Write-Host "DEBUG: PO Score -> $scorePo"
 
@@ -150,13 +151,7 @@ foreach ($dir in Get-ChildItem -Path "_addonL10n/$addonId" -Directory) {
 
     if (Test-Path $remoteXliff) {
 
-        Write-Host "DEBUG: Evaluating Remote XLIFF score..."
-
-        $res = uv run python .github/scripts/checkTranslation.py "$addonId.xliff" $crowdinLang
-
-        $scoreXliff = [double](
-            ($res | Select-String "xliffScore=").ToString().Split("=")[1]
-        )
+        $scoreXliff = [double]$remoteScores."$langCode".xliffScore
     }
     else {
         Write-Host "DEBUG: No remote XLIFF file found for this language."
@@ -0,0 +1,600 @@
+# -*- coding: UTF-8 -*-
+# NumberProcessing
+# Copyright Alberto Buffolino, released under GPL
+# Number transform of the numberProcessing plugin, without NVDA or wx imports,
+# so that it can also be used outside NVDA (see __main__.py);
+# not loaded as a global plugin, because of the leading underscore
+import re
+
+from bisect import bisect_left
+from collections import OrderedDict
+from time import perf_counter_ns
+
+
+# see https://www.currencycalc.com/symbols
+CURRENCY_SYMBOLS = (
+	"$",
+	"£",
+	"¥",
+	"¤",
+	"💵",
+	"💶",
+	"💷",
+	"💴",
+	"﷼",
+	"৳",
+	"៛",
+	"฿",
+	"\\u20a0-\\u20cf",  # Unicode currency block
+)
+# optional recognition rules for specific kinds of numbers, in priority order;
+# matches are processed by the NumberScanner method named after the rule
+NUMBER_RULES = OrderedDict(
+	(
+		("iban", r"[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,3})?"),
+		("card", r"\d{4}[ -]?\d{6}[ -]?\d{5}|\d{4}(?:[ -]?\d{4}){3}\d{0,3}"),
+		("ip", r"(?:(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)\.){3}(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)"),
+		("dates", r"\d{4}-\d{2}-\d{2}|\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}"),
+		("times", r"\d{1,2}:\d{2}(?::\d{2})?"),
+		(
+			"phone",
+			r"\+\d{1,3}(?:[ -]?\(?\d{1,4}\)?)?(?:[ -]?\d{2,4}){2,4}"
+			+ r"|\(\d{2,4}\)[ -]?\d{3,4}[ -]?\d{3,4}|\d{3}[ -]\d{3}[ -]\d{4}",
+		),
+		("years", r"(?:1[89]|20)\d{2}"),
+	)
+)
+# output modes of processed numbers
+OUTPUT_MODES = ("spacing", "characterMode", "breaks")
+# group sizes of fixed grouping modes
+GROUP_SIZES = {
+	"singles": (1,),
+	"pairs": (2,),
+	"triples": (3,),
+}
+# digit runs up to this length are grouped by precomputed slices
+GROUP_TABLE_LENGTH = 64
+# longer items are processed in chunks, checking time budget
+CHUNK_LENGTH = 4096
+# plain numbers of this length, with separators, are matched even if left unchanged
+LONG_NUMBER_LENGTH = 16
+# pause between digits in breaks output mode, in milliseconds
+DIGIT_BREAK_TIME = 50
+# noncharacters marking digit runs to convert in speech commands
+RUN_START = "\ufdd0"
+RUN_END = "\ufdd1"
+condExp = re.compile(r"\d")
+separatorExp = re.compile(r"([,.])")
+markedRunExp = re.compile(r"%s([^%s]+)%s" % (RUN_START, RUN_END, RUN_END))
+digitGroupExp = re.compile(r"\d+")
+
+
+class Metrics(object):
+	"""Counters and per stage latency histograms of the speech filter and braille regions."""
+
+	# filter stages: whole sequence, its overhead outside cache lookup and scanner, cache lookup, scanner;
+	# braille region, without its translation to braille
+	STAGES = ("sequence", "overhead", "lookup", "scan", "braille")
+	# upper bounds of histogram buckets, in microseconds
+	BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+	def __init__(self):
+		self.bucketBounds = [bound * 1000 for bound in self.BUCKETS]
+		self.reset()
+
+	def reset(self):
+		self.sequences = 0
+		self.items = 0
+		self.rewrittenItems = 0
+		self.expandedDigits = 0
+		self.oversizedItems = 0
+		self.exceededBudgets = 0
+		self.droppedUpdates = 0
+		self.brailleRegions = 0
+		self.rewrittenRegions = 0
+		self.histograms = {stage: [0] * (len(self.BUCKETS) + 1) for stage in self.STAGES}
+
+	def addTime(self, stage, nanoseconds):
+		self.histograms[stage][bisect_left(self.bucketBounds, nanoseconds)] += 1
+
+	def getReport(self):
+		lines = [
+			"%d sequences, %d items, %d rewritten items, %d expanded digits"
+			% (self.sequences, self.items, self.rewrittenItems, self.expandedDigits),
+			"%d oversized items, %d items over time budget, %d dropped updates"
+			% (self.oversizedItems, self.exceededBudgets, self.droppedUpdates),
+			"%d braille regions, %d rewritten braille regions" % (self.brailleRegions, self.rewrittenRegions),
+		]
+		labels = ["<=%dus" % bound for bound in self.BUCKETS] + [">%dus" % self.BUCKETS[-1]]
+		for stage in self.STAGES:
+			counts = self.histograms[stage]
+			buckets = ", ".join("%s: %d" % (label, count) for label, count in zip(labels, counts) if count)
+			lines.append("%s (%d): %s" % (stage, sum(counts), buckets or "-"))
+		return "\n".join(lines)
+
+
+metrics = Metrics()
+
+
+class NumberExceptions(object):
+	"""Numbers never to process. Exact entries are kept in a set;
+	entries with wildcards ("?" for any character, a final "*" for any ending)
+	in a trie, walked as an automaton, so cost of a check doesn't grow with entries."""
+
+	# trie keys marking end of an entry, and of a prefix entry
+	END = ""
+	ANY_ENDING = "*"
+
+	def __init__(self, entries):
+		self.exact = set()
+		self.trie = {}
+		for entry in entries:
+			entry = entry.strip()
+			if not entry:
+				continue
+			if "?" not in entry and not entry.endswith("*"):
+				self.exact.add(entry)
+				continue
+			node = self.trie
+			for char in entry.rstrip("*"):
+				node = node.setdefault(char, {})
+			node[self.ANY_ENDING if entry.endswith("*") else self.END] = True
+
+	def __contains__(self, number):
+		if number in self.exact:
+			return True
+		if not self.trie:
+			return False
+		nodes = [self.trie]
+		for char in number:
+			nextNodes = []
+			for node in nodes:
+				if self.ANY_ENDING in node:
+					return True
+				if char in node:
+					nextNodes.append(node[char])
+				if "?" in node:
+					nextNodes.append(node["?"])
+			if not nextNodes:
+				return False
+			nodes = nextNodes
+		return any(self.END in node or self.ANY_ENDING in node for node in nodes)
+
+
+class CurrencyTrie(object):
+	"""Currency symbols of any length, like "USD", "R$" or "kr", kept in a trie;
+	its pattern is factored on common prefixes, so that the regular expression engine
+	walks it as an automaton, with matching cost not growing with number of symbols."""
+
+	# key marking end of a symbol
+	END = ""
+
+	def __init__(self, symbols=()):
+		self.root = {}
+		self.lastChars = set()
+		for symbol in symbols:
+			self.add(symbol)
+
+	def add(self, symbol):
+		symbol = symbol.strip()
+		if not symbol:
+			return
+		node = self.root
+		for char in symbol:
+			node = node.setdefault(char, {})
+		node[self.END] = {}
+		self.lastChars.add(symbol[-1])
+
+	def __bool__(self):
+		return bool(self.root)
+
+	def getPattern(self, node=None):
+		if node is None:
+			node = self.root
+		branches = [
+			re.escape(char) + self.getPattern(child)
+			for char, child in sorted(node.items())
+			if char != self.END
+		]
+		if self.END in node:
+			# longer symbols are preferred
+			return "(?:%s)?" % "|".join(branches) if branches else ""
+		return branches[0] if len(branches) == 1 else "(?:%s)" % "|".join(branches)
+
+
+class NumberScanner(object):
+	"""Moves currency symbols after amounts and spaces out long digit runs,
+	in a single substitution pass over the text.
+	Enabled number rules are compiled in the same pattern, as alternatives
+	tried before plain numbers, and their matches are dispatched to
+	the method named after the rule.
+	In other output modes, long digit runs are marked between RUN_START and RUN_END,
+	with groups separated by two spaces.
+	In spacing mode, groupSeparator is put between digit groups, and groupPause
+	between groups of numbers recognized by rules, like cards and phones.
+	Other currency symbols, of any length, are matched by a CurrencyTrie,
+	both before amounts and, when amounts are normalized, after them.
+	Spelled digits are counted in metrics unless countDigits is false,
+	as for text processed in background."""
+
+	def __init__(
+		self,
+		symbols,
+		minLen,
+		outputMode="spacing",
+		enabledRules=(),
+		exceptions=(),
+		groupSizes=(1,),
+		ipSeparator=" dot ",
+		currencies=(),
+		normalizeAmounts=False,
+		decimalSeparator=".",
+		groupSeparator="  ",
+		groupPause=", ",
+		countDigits=True,
+	):
+		symbols = "".join(symbols)
+		# number with decimal/thousands separators
+		number = r"\d+(?:[,.]\d+)*"
+		currencyTrie = CurrencyTrie(currencies)
+		symbol = "[%s]" % symbols
+		if currencyTrie:
+			# symbols beginning with a letter are never matched inside words
+			symbol = r"[%s]|(?<![^\W\d_])%s" % (symbols, currencyTrie.getPattern())
+		# amount followed by currency symbol, recognized only to normalize it
+		suffix = r"|[ \u00a0]?(?:%s)(?![^\W\d_])" % symbol if normalizeAmounts else ""
+		alternatives = []
+		# dispatch table of group names to processing methods
+		self.expanders = {"number": self.expandNumber}
+		for name, pattern in NUMBER_RULES.items():
+			if name in enabledRules:
+				# rules never match inside words or longer numbers
+				alternatives.append(r"(?P<%s>(?<![\w,.])(?:%s)(?!\w|[,.]\d))" % (name, pattern))
+				self.expanders[name] = getattr(self, name)
+		if len(self.expanders) == 1:
+			# without rules, all matches are numbers, with exceptions checked while expanding them
+			self.replace = self.expandNumber
+		# an amount preceded by currency symbol, or a plain number;
+		# the latter is extended with the amount directly following it,
+		# because moving "12$34" to "1234$" joins their digits;
+		# other plain numbers are left unchanged, so they are matched, from their first digit,
+		# only with a digit run to spell, or of at least LONG_NUMBER_LENGTH characters,
+		# since failing at each of their digits would cost more than leaving them unchanged;
+		# the first digit comes before lookarounds, so that other characters fail at once
+		rest = r"\d*(?:[,.]\d+)*"
+		spelledNumber = (
+			r"\d(?<!\d\d)(?<!\d[,.]\d)"
+			+ r"(?=\d{%d}|\d*+(?:[,.](?!\d{%d})\d+)*+(?:[,.]\d|[%s]\d%s)|[\d,.]{%d})%s"
+		) % (minLen - 1, minLen, symbols, suffix, LONG_NUMBER_LENGTH, rest)
+		numberAlternatives = [
+			(
+				r"(?P<number>(?P<symbol>%s)(?P<space>\s*)(?P<amount>%s)"
+				+ r"|(?P<plainNumber>%s)(?:(?P<nextSymbol>[%s])(?P<nextNumber>%s)%s)?)"
+			)
+			% (symbol, number, plainNumber, symbols, number, suffix)
+			for plainNumber in (spelledNumber, number)
+		]
+		self.numberExp = re.compile("|".join(alternatives + numberAlternatives[:1]))
+		# text processed match by match checks its deadline after matches,
+		# so all plain numbers are matched there; compiled when first needed
+		self.allNumbersPattern = "|".join(alternatives + numberAlternatives[1:])
+		self.allNumbersExp = None
+		# characters never part of a match, where text can be split;
+		# a new line only after a character other than whitespace or currency symbol
+		# (or last character of other currency symbols)
+		symbolChars = re.escape("".join(set("".join(currencies))))
+		lastChars = re.escape("".join(currencyTrie.lastChars))
+		self.boundaryExp = re.compile(
+			r"[^\w\s,.+()\-/:%s%s]|(?<![\s%s%s])\n" % (symbols, symbolChars, symbols, lastChars)
+		)
+		# whitespace where text without boundaries can be split: matches contain whitespace
+		# only after a digit (before a currency symbol) or before a digit, "(" or more whitespace;
+		# before a capital letter, only in IBAN codes, after a group of exactly four characters
+		self.splitExp = re.compile(
+			r"(?<!\d)\s(?:(?![\s\dA-Z(])|(?=[A-Z])(?:(?<![A-Z0-9]{4}\s)|(?<=[A-Z0-9]{5}\s)))"
+		)
+		self.minLen = minLen
+		self.runExp = re.compile(r"\d{%d}" % minLen)
+		self.exceptions = NumberExceptions(exceptions) if exceptions else None
+		# expansion table: group slices of digit runs, by run length;
+		# grouping is not possible in character mode
+		self.groupSizes = groupSizes if outputMode != "characterMode" else (1,)
+		if self.groupSizes != (1,):
+			self.groupSlices = [self.makeGroupSlices(length) for length in range(GROUP_TABLE_LENGTH)]
+		self.outputMode = outputMode
+		self.ipSeparator = ipSeparator
+		# marked runs are split on two spaces
+		self.groupSeparator = groupSeparator if outputMode == "spacing" else "  "
+		self.groupPause = groupPause
+		self.normalizeAmounts = normalizeAmounts
+		self.decimalSeparator = decimalSeparator
+		self.countDigits = countDigits
+		if outputMode == "spacing" and self.groupSizes == (1,):
+			# the most common output, without checks for each run
+			self.spell = self.spellDigits
+
+	def makeGroupSlices(self, length):
+		slices = []
+		start = 0
+		while start < length:
+			for size in self.groupSizes:
+				slices.append(slice(start, start + size))
+				start += size
+				if start >= length:
+					break
+		return tuple(slices)
+
+	def group(self, chars):
+		if self.groupSizes == (1,):
+			return self.groupSeparator.join(chars)
+		length = len(chars)
+		slices = self.groupSlices[length] if length < GROUP_TABLE_LENGTH else self.makeGroupSlices(length)
+		return self.groupSeparator.join([chars[groupSlice] for groupSlice in slices])
+
+	def spell(self, chars):
+		if self.countDigits:
+			metrics.expandedDigits += len(chars)
+		if self.outputMode == "characterMode":
+			return RUN_START + chars + RUN_END
+		grouped = self.groupSeparator.join(chars) if self.groupSizes == (1,) else self.group(chars)
+		if self.outputMode == "breaks":
+			return RUN_START + grouped + RUN_END
+		return grouped
+
+	def spellDigits(self, chars):
+		if self.countDigits:
+			metrics.expandedDigits += len(chars)
+		return self.groupSeparator.join(chars)
+
+	def expand(self, number):
+		minLen = self.minLen
+		if len(number) < minLen or self.exceptions is not None and number in self.exceptions:
+			return number
+		if number.isdigit():
+			return self.spell(number)
+		# long numbers are matched even without digit runs to spell, then parts are not looked at
+		if len(number) >= LONG_NUMBER_LENGTH and self.runExp.search(number) is None:
+			return number
+		parts = separatorExp.split(number)
+		return "".join([self.spell(part) if len(part) >= minLen else part for part in parts])
+
+	def spellGroups(self, groups):
+		# by default, a comma makes a short pause between groups
+		return self.groupPause.join([self.spell(group) for group in groups])
+
+	def normalizeAmount(self, amount):
+		"""Removes thousands separators, so that integer part is a single digit run.
+		The last separator is the decimal one, unless followed by three digits,
+		or the same as a previous one; a single separator followed by three digits
+		is decimal only if it is decimalSeparator."""
+		parts = separatorExp.split(amount)
+		if len(parts) == 1:
+			return amount
+		separators = parts[1::2]
+		last = separators[-1]
+		if len(parts[-1]) != 3 and last not in separators[:-1]:
+			decimal = last
+		elif len(separators) == 1 and last == self.decimalSeparator:
+			decimal = last
+		else:
+			decimal = None
+		integer = parts[:-2] if decimal else parts
+		normalized = "".join(integer[::2])
+		if decimal:
+			normalized += decimal + parts[-1]
+		return normalized
+
+	def expandNumber(self, match):
+		# groups are read only as needed, since most numbers have no currency symbol
+		symbol = match["symbol"]
+		# to avoid problems with decimal separator,
+		# currency sign goes to the end of the amount
+		if symbol:
+			amount = match["amount"]
+			if self.normalizeAmounts:
+				amount = self.normalizeAmount(amount)
+			# amounts are often too short to spell
+			if len(amount) >= self.minLen:
+				amount = self.expand(amount)
+			if symbol[0].isalpha():
+				# keep codes like "USD" apart from digits
+				return match["space"] + amount + " " + symbol
+			return match["space"] + amount + symbol
+		plainNumber = match["plainNumber"]
+		nextSymbol = match["nextSymbol"]
+		if nextSymbol:
+			return self.expand(plainNumber + match["nextNumber"]) + nextSymbol
+		if self.normalizeAmounts and match.end("plainNumber") < match.end():
+			# amount with following currency symbol
+			suffix = match.string[match.end("plainNumber") : match.end()]
+			return self.expand(self.normalizeAmount(plainNumber)) + suffix
+		return self.expand(plainNumber)
+
+	def iban(self, match):
+		code = match.group().replace(" ", "")
+		return self.spellGroups([code[index : index + 4] for index in range(0, len(code), 4)])
+
+	def card(self, match):
+		digits = "".join(digitGroupExp.findall(match.group()))
+		return self.spellGroups([digits[index : index + 4] for index in range(0, len(digits), 4)])
+
+	def ip(self, match):
+		return self.ipSeparator.join(match.group().split("."))
+
+	def phone(self, match):
+		text = match.group()
+		prefix = "+" if text.startswith("+") else ""
+		return prefix + self.spellGroups(digitGroupExp.findall(text))
+
+	def leaveUnchanged(self, match):
+		return match.group()
+
+	dates = times = years = leaveUnchanged
+
+	def replace(self, match):
+		kind = match.lastgroup
+		# exceptions of plain numbers are checked without currency symbols
+		if kind != "number" and self.exceptions is not None and match.group() in self.exceptions:
+			return match.group()
+		return self.expanders[kind](match)
+
+	def process(self, text):
+		# every match has digits, and most text has none
+		if not condExp.search(text):
+			return text
+		return self.numberExp.sub(self.replace, text)
+
+	def processChunks(self, text, deadline):
+		"""Processes text in chunks split on boundaries, so output is the same as process;
+		text without boundaries for over twice CHUNK_LENGTH, like words and numbers
+		without punctuation, is split on whitespace never part of a match,
+		or else after matches.
+		After deadline (perf_counter_ns), the rest of text is left unchanged.
+		Returns processed text and whether it was completed."""
+		output = []
+		start = 0
+		length = len(text)
+		while start < length:
+			limit = start + 2 * CHUNK_LENGTH
+			if limit >= length:
+				end = length
+			else:
+				# searched up to limit, so that text without boundaries is scanned once
+				split = self.boundaryExp.search(text, start + CHUNK_LENGTH, limit)
+				if split is None:
+					# the character after the split point is looked at too
+					split = self.splitExp.search(text, start + CHUNK_LENGTH, limit + 1)
+				end = split.start() if split is not None and split.start() < limit else None
+			if end is not None:
+				output.append(self.process(text[start:end]))
+				start = end
+			else:
+				start = self.processMatches(text, start, length, deadline, output)
+			if start < length and perf_counter_ns() > deadline:
+				output.append(text[start:])
+				return "".join(output), False
+		return "".join(output), True
+
+	def processMatches(self, text, start, end, deadline, output):
+		"""Appends processed text between start and end to output, match by match,
+		checking deadline after every CHUNK_LENGTH characters or so;
+		text between matches is never changed, so it can stop after any match.
+		Returns where it stopped: end, or the end of a match after deadline."""
+		lastEnd = checkedEnd = start
+		if self.allNumbersExp is None:
+			self.allNumbersExp = re.compile(self.allNumbersPattern)
+		# searched in whole text, so that lookbehinds see characters before start
+		for match in self.allNumbersExp.finditer(text, start, end):
+			output.append(text[lastEnd : match.start()])
+			output.append(self.replace(match))
+			lastEnd = match.end()
+			if lastEnd - checkedEnd >= CHUNK_LENGTH:
+				if perf_counter_ns() > deadline:
+					return lastEnd
+				checkedEnd = lastEnd
+		output.append(text[lastEnd:end])
+		return end
+
+
+class TransformCache(object):
+	"""LRU cache of processed strings, bounded by number of entries and total characters."""
+
+	def __init__(self, maxEntries, maxChars):
+		self.maxEntries = maxEntries
+		self.maxChars = maxChars
+		self.entries = OrderedDict()
+		self.chars = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def get(self, rules, text):
+		key = (rules, text)
+		result = self.entries.get(key)
+		if result is None:
+			self.misses += 1
+		else:
+			self.hits += 1
+			self.entries.move_to_end(key)
+		return result
+
+	def put(self, rules, text, result):
+		size = len(text) + len(result)
+		if size > self.maxChars:
+			return
+		key = (rules, text)
+		if key in self.entries:
+			return
+		self.entries[key] = result
+		self.chars += size
+		# discard least recently used entries
+		while len(self.entries) > self.maxEntries or self.chars > self.maxChars:
+			(oldRules, oldText), oldResult = self.entries.popitem(last=False)
+			self.chars -= len(oldText) + len(oldResult)
+			self.evictions += 1
+
+	def clear(self):
+		self.entries.clear()
+		self.chars = 0
+
+	def getStats(self):
+		return "%d entries, %d chars, %d hits, %d misses, %d evictions" % (
+			len(self.entries),
+			self.chars,
+			self.hits,
+			self.misses,
+			self.evictions,
+		)
+
+
+def getGroupSizes(groupingMode, groupingPattern):
+	if groupingMode in GROUP_SIZES:
+		return GROUP_SIZES[groupingMode]
+	# positive numbers of the pattern, like "4-4-4-4" or "3 3 4"
+	sizes = tuple(int(size) for size in re.findall(r"\d+", groupingPattern) if int(size))
+	return sizes or (1,)
+
+
+def alignProcessedText(text, processed):
+	"""Aligns text processed in spacing mode with the original one, mapping positions both ways,
+	as needed on braille displays; whitespace added after other whitespace, in place of removed
+	characters like currency codes moved after the amount, is left out.
+	Processing never changes digits or their order, so digits are aligned exactly;
+	other characters are aligned when equal, otherwise they were removed or added by processing.
+	Returns the plain text, its position of each character of text (and of its end),
+	and the text position of each of its characters."""
+	chars = []
+	# removed characters go to next output character, added ones come from next text character
+	textToOutput = []
+	outputToText = []
+	length = len(text)
+	index = 0
+	# whether last output character is whitespace, and whether it was added after other whitespace
+	afterSpace = True
+	doubleSpace = False
+	for char in processed:
+		if char.isdigit():
+			if doubleSpace and index < length and text[index] != char:
+				chars.pop()
+				outputToText.pop()
+			while index < length and text[index] != char:
+				textToOutput.append(len(chars))
+				index += 1
+		if index < length and char == text[index]:
+			textToOutput.append(len(chars))
+			outputToText.append(index)
+			index += 1
+			doubleSpace = False
+		else:
+			outputToText.append(index)
+			doubleSpace = afterSpace and char.isspace()
+		afterSpace = char.isspace()
+		chars.append(char)
+	textToOutput.extend([len(chars)] * (length - index))
+	# positions past the end are those of the last character
+	last = len(chars) - 1
+	textToOutput = [min(position, last) for position in textToOutput]
+	textToOutput.append(len(chars))
+	last = length - 1
+	outputToText = [min(position, last) for position in outputToText]
+	return "".join(chars), textToOutput, outputToText
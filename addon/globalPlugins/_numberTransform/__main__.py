@@ -0,0 +1,175 @@
+# -*- coding: UTF-8 -*-
+# NumberProcessing
+# Copyright Alberto Buffolino, released under GPL
+# Applies the number transform of the plugin to text files or stdin, line by line.
+# Usage, from addon/globalPlugins:
+# python -m _numberTransform [files] [--min-len N] [--output-mode MODE] [--rules NAMES] [--stats]
+# In characterMode and breaks output modes, spelled digits are written as SSML.
+
+import argparse
+import mmap
+import os
+import sys
+import time
+
+from . import (
+	CURRENCY_SYMBOLS,
+	DIGIT_BREAK_TIME,
+	GROUP_SIZES,
+	NUMBER_RULES,
+	OUTPUT_MODES,
+	NumberScanner,
+	getGroupSizes,
+	markedRunExp,
+)
+
+# files at least this big are read through a memory map
+MMAP_MIN_SIZE = 16 * 1024 * 1024
+
+
+class Stats(object):
+	def __init__(self):
+		self.lines = 0
+		self.inputChars = 0
+		self.outputChars = 0
+		self.startTime = time.perf_counter()
+
+	def getReport(self):
+		seconds = max(time.perf_counter() - self.startTime, 1e-9)
+		return "%d lines, %d chars in, %d chars out in %.3fs: %.0f lines/s, %.0f chars/s" % (
+			self.lines,
+			self.inputChars,
+			self.outputChars,
+			seconds,
+			self.lines / seconds,
+			self.inputChars / seconds,
+		)
+
+
+def readFile(path, encoding):
+	if os.path.getsize(path) < MMAP_MIN_SIZE:
+		# empty files can't be mapped, too
+		with open(path, encoding=encoding, errors="replace", newline="") as f:
+			yield from f
+		return
+	with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+		for line in iter(data.readline, b""):
+			yield line.decode(encoding, errors="replace")
+
+
+def readInputs(paths, encoding):
+	if not paths:
+		yield from sys.stdin
+		return
+	for path in paths:
+		if path == "-":
+			yield from sys.stdin
+		else:
+			yield from readFile(path, encoding)
+
+
+def escape(text):
+	# as xml.sax.saxutils.escape, whose import costs more than processing most inputs
+	return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def toSSML(line, scanner):
+	"""Processes a line, converting marked digit runs to SSML."""
+	parts = markedRunExp.split(scanner.process(escape(line)))
+	for index in range(1, len(parts), 2):
+		if scanner.outputMode == "characterMode":
+			parts[index] = '<say-as interpret-as="characters">%s</say-as>' % parts[index]
+		else:
+			parts[index] = ('<break time="%dms"/>' % DIGIT_BREAK_TIME).join(parts[index].split("  "))
+	return "".join(parts)
+
+
+def transform(lines, scanner, stats):
+	# lines are processed one by one, so memory doesn't grow with input
+	process = scanner.process
+	for line in lines:
+		if scanner.outputMode == "spacing":
+			output = process(line)
+		else:
+			output = toSSML(line, scanner)
+		stats.lines += 1
+		stats.inputChars += len(line)
+		stats.outputChars += len(output)
+		yield output
+
+
+def parseRules(value):
+	if value == "all":
+		return tuple(NUMBER_RULES)
+	rules = tuple(name.strip() for name in value.split(",") if name.strip())
+	for name in rules:
+		if name not in NUMBER_RULES:
+			raise argparse.ArgumentTypeError(
+				"unknown rule %s, choose among %s" % (name, ", ".join(NUMBER_RULES))
+			)
+	return rules
+
+
+def main():
+	parser = argparse.ArgumentParser(
+		prog="python -m _numberTransform",
+		description="Spell long numbers of text files or stdin, as the numberProcessing NVDA add-on does.",
+	)
+	parser.add_argument("files", nargs="*", help="files to process, stdin if none or -")
+	parser.add_argument("--min-len", type=int, default=2, help="minimum number of digits to process")
+	parser.add_argument(
+		"--output-mode", choices=OUTPUT_MODES, default="spacing", help="how digits are written"
+	)
+	parser.add_argument(
+		"--grouping",
+		default="singles",
+		help="digits read together: %s, or group sizes like 4-4-4-4" % ", ".join(GROUP_SIZES),
+	)
+	parser.add_argument(
+		"--rules",
+		type=parseRules,
+		default=(),
+		help="comma separated number rules to enable, or all: %s" % ", ".join(NUMBER_RULES),
+	)
+	parser.add_argument("--exceptions", nargs="*", default=(), help="numbers never processed")
+	parser.add_argument(
+		"--currencies", nargs="*", default=(), help="other currency symbols, of any length, like USD or R$"
+	)
+	parser.add_argument(
+		"--normalize-amounts", action="store_true", help="remove thousands separators from amounts"
+	)
+	parser.add_argument(
+		"--decimal-separator", choices=(".", ","), default=".", help="decimal separator of amounts like 1,234"
+	)
+	parser.add_argument("--encoding", default="utf-8", help="encoding of input files")
+	parser.add_argument("--stats", action="store_true", help="report throughput on stderr")
+	args = parser.parse_args()
+
+	groupingMode = args.grouping if args.grouping in GROUP_SIZES else "pattern"
+	scanner = NumberScanner(
+		CURRENCY_SYMBOLS,
+		args.min_len,
+		args.output_mode,
+		args.rules,
+		args.exceptions,
+		getGroupSizes(groupingMode, args.grouping),
+		" dot ",
+		args.currencies,
+		args.normalize_amounts,
+		args.decimal_separator,
+	)
+	stats = Stats()
+	write = sys.stdout.write
+	try:
+		for output in transform(readInputs(args.files, args.encoding), scanner, stats):
+			write(output)
+		sys.stdout.flush()
+	except BrokenPipeError:
+		# output closed early, like by head
+		sys.stdout = None
+	if args.stats:
+		print(stats.getReport(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,125 @@
+# -*- coding: UTF-8 -*-
+# NumberProcessing
+# Copyright Alberto Buffolino, released under GPL
+# Batch transform of large corpora, sharded across worker processes
+
+import os
+
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+from . import CURRENCY_SYMBOLS, NumberScanner
+
+
+class TransformSettings(
+	namedtuple(
+		"TransformSettings",
+		(
+			"minLen",
+			"outputMode",
+			"enabledRules",
+			"exceptions",
+			"groupSizes",
+			"ipSeparator",
+			"currencies",
+			"normalizeAmounts",
+			"decimalSeparator",
+		),
+		defaults=("spacing", (), (), (1,), " dot ", (), False, "."),
+	)
+):
+	"""Snapshot of settings the scanner is compiled from; must be picklable.
+	Only spacing output mode is supported, since other modes mark digit runs
+	to be converted to speech commands, which don't exist outside NVDA."""
+
+	__slots__ = ()
+
+	def __new__(cls, *args, **kwargs):
+		settings = super(TransformSettings, cls).__new__(cls, *args, **kwargs)
+		if settings.outputMode != "spacing":
+			raise ValueError("output mode %s not supported in batch, only spacing" % settings.outputMode)
+		return settings
+
+
+# strings or sequences per task sent to a worker
+CHUNK_SIZE = 2000
+# inputs shorter than this are processed in current process
+MIN_PARALLEL_ITEMS = 20000
+# chunks submitted ahead of the one being returned, per worker
+CHUNKS_AHEAD = 2
+
+# scanner of current worker process, compiled once by initWorker
+workerScanner = None
+
+
+def makeScanner(settings):
+	return NumberScanner(
+		CURRENCY_SYMBOLS,
+		settings.minLen,
+		settings.outputMode,
+		settings.enabledRules,
+		settings.exceptions,
+		settings.groupSizes,
+		settings.ipSeparator,
+		settings.currencies,
+		settings.normalizeAmounts,
+		settings.decimalSeparator,
+	)
+
+
+def initWorker(settings):
+	global workerScanner
+	workerScanner = makeScanner(settings)
+
+
+def transformItems(scanner, items):
+	"""Processes strings, and string items of sequences, keeping other items."""
+	process = scanner.process
+	results = []
+	for item in items:
+		if isinstance(item, str):
+			results.append(process(item))
+		else:
+			results.append([process(part) if isinstance(part, str) else part for part in item])
+	return results
+
+
+def transformChunk(items):
+	return transformItems(workerScanner, items)
+
+
+def iterChunks(iterator, size):
+	while True:
+		chunk = list(islice(iterator, size))
+		if not chunk:
+			return
+		yield chunk
+
+
+def transformBatch(items, settings, workers=None, chunkSize=CHUNK_SIZE, minParallelItems=MIN_PARALLEL_ITEMS):
+	"""
+	Yields processed items in input order; items are strings,
+	or sequences whose string items are processed.
+	Work is split in chunks across a pool of worker processes,
+	with a bounded number of chunks in flight, so input can be a stream;
+	inputs shorter than minParallelItems, or a single worker, are processed in current process.
+	"""
+	workers = workers or os.cpu_count() or 1
+	iterator = iter(items)
+	head = list(islice(iterator, minParallelItems))
+	if len(head) < minParallelItems or workers == 1:
+		scanner = makeScanner(settings)
+		yield from transformItems(scanner, head)
+		for chunk in iterChunks(iterator, chunkSize):
+			yield from transformItems(scanner, chunk)
+		return
+	maxPending = workers * CHUNKS_AHEAD
+	with ProcessPoolExecutor(workers, initializer=initWorker, initargs=(settings,)) as executor:
+		pending = deque()
+		for chunk in iterChunks(chain(head, iterator), chunkSize):
+			pending.append(executor.submit(transformChunk, chunk))
+			if len(pending) >= maxPending:
+				yield from pending.popleft().result()
+		while pending:
+			yield from pending.popleft().result()
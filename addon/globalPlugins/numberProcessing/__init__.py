@@ -0,0 +1,914 @@
+# -*- coding: UTF-8 -*-
+# NumberProcessing
+# A global plugin for NVDA
+# Copyright Alberto Buffolino, released under GPL
+# Add-on to read digit by digit any number of specified length
+# from an experimental idea of Derek Riemer
+import addonHandler
+import config
+import controlTypes
+import core
+import globalPluginHandler
+import globalVars
+import json
+import locale
+import os
+import re
+import speech
+import ui
+
+from collections import deque
+from enum import Enum
+from time import perf_counter_ns, strftime
+from logHandler import log
+from scriptHandler import script, getLastScriptRepeatCount
+from speech.commands import BaseCallbackCommand, BreakCommand, CharacterModeCommand, IndexCommand
+from .._numberTransform import (
+	CHUNK_LENGTH, CURRENCY_SYMBOLS, DIGIT_BREAK_TIME,
+	NumberScanner, TransformCache, alignProcessedText, condExp, digitGroupExp, getGroupSizes, markedRunExp,
+	metrics,
+)
+
+
+addonHandler.initTranslation()
+
+DEBUG = False
+confspec = {
+	"autoEnable": "boolean(default=false)",
+	"userMinLen": "integer(default=2)",
+	# longer items are left unchanged
+	"maxItemLength": "integer(default=100000)",
+	# milliseconds to process an item, before leaving the rest unchanged
+	"itemTimeBudget": "integer(default=50)",
+	# how digits of processed numbers are presented to synthesizer
+	"outputMode": 'option("spacing", "characterMode", "breaks", default="spacing")',
+	# names of enabled NUMBER_RULES
+	"enabledRules": "string_list(default=list())",
+	# numbers never processed, see NumberExceptions
+	"exceptions": "string_list(default=list())",
+	# how many digits are read together
+	"groupingMode": 'option("singles", "pairs", "triples", "pattern", default="singles")',
+	# group sizes of pattern grouping mode, repeated for longer numbers
+	"groupingPattern": 'string(default="4-4-4-4")',
+	# app module names where numbers are processed, all if empty
+	"enabledApps": "string_list(default=list())",
+	# names of controlTypes.Role where numbers are processed, all if empty
+	"enabledRoles": "string_list(default=list())",
+	# process upcoming text of browse mode documents in background
+	"prefetch": "boolean(default=False)",
+	# join digit runs split across speech items and sequences
+	"streaming": "boolean(default=False)",
+	# currency symbols of any length, besides CURRENCY_SYMBOLS
+	"currencySymbols": "string_list(default=list())",
+	# amounts read without thousands separators
+	"normalizeAmounts": "boolean(default=False)",
+	# speak only the latest of repeating numeric updates, like progress bars
+	"coalesceUpdates": "boolean(default=False)",
+	# milliseconds between sequences to consider them updates of the same thing
+	"coalesceWindow": "integer(default=1000)",
+	# updates spoken per second, at most
+	"coalesceMaxRate": "integer(default=1)",
+	# process text of braille regions too, as it is spoken
+	"braille": "boolean(default=False)",
+}
+config.conf.spec["numberProcessing"] = confspec
+# settings compiled in processing rules
+RULE_SETTINGS = (
+	"autoEnable", "userMinLen", "maxItemLength", "itemTimeBudget", "outputMode", "enabledRules", "exceptions",
+	"groupingMode", "groupingPattern", "enabledApps", "enabledRoles", "prefetch", "streaming",
+	"currencySymbols", "normalizeAmounts", "coalesceUpdates", "coalesceWindow", "coalesceMaxRate", "braille")
+# bounds of the processed strings cache
+CACHE_MAX_ENTRIES = 512
+CACHE_MAX_CHARS = 256*1024
+# upcoming text processed in background, kept below cache bounds
+PREFETCH_MAX_ITEMS = 256
+PREFETCH_MAX_CHARS = 64*1024
+# upcoming text fetched at each step on main thread
+PREFETCH_SLICE_CHARS = 4096
+# digit runs split across items are joined only when long as codes and IDs,
+# and without pieces of a single digit, like that of "column 2" before the text of a cell
+STREAM_MIN_LEN = 8
+STREAM_MIN_PIECE = 2
+trailingDigitsExp = re.compile(r"\d+$")
+# matched at last character; str.isdigit is also true for digits that \d doesn't match, like "²"
+lastDigitExp = re.compile(r"\d$")
+# leading number, with its decimals
+leadingNumberExp = re.compile(r"\d+(?:[,.]\d+)*")
+leadingDigitsExp = re.compile(r"\d+")
+# leading digits not followed by decimals
+continuedRunExp = re.compile(r"\d+(?!\d|[,.]\d)")
+profileStatus = {}
+
+class Status(Enum):
+
+	DISABLED = 0
+	AUTO_ENABLED = 1
+	MANUAL_ENABLED = 2
+
+
+# message is formatted only when DEBUG is set
+def debugLog(message, *args):
+	if DEBUG:
+		log.info(message, *args)
+
+
+class SpeechCapture(object):
+	"""Writes speech sequences to a file, one compact JSON array per line;
+	speech commands are written as their type name only."""
+
+	def __init__(self, path):
+		self.path = path
+		self.file = open(path, "w", encoding="utf-8")
+		self.sequences = 0
+
+	def write(self, speechSequence):
+		items = [item if isinstance(item, str) else {"type": type(item).__name__} for item in speechSequence]
+		self.file.write(json.dumps(items, ensure_ascii=False, separators=(",", ":")))
+		self.file.write("\n")
+		self.sequences += 1
+
+	def close(self):
+		self.file.close()
+
+
+# active speech capture, if any
+speechCapture = None
+
+
+class Prefetcher(object):
+	"""Processes upcoming text in a background thread, handing results to the speech filter.
+	Text is fed in slices by main thread, and the worker stops at the first of cancel,
+	maxItems processed strings or maxChars processed characters."""
+
+	def __init__(self, maxItems, maxChars):
+		self.maxItems = maxItems
+		self.maxChars = maxChars
+		# (rules, text, result) appended by worker and taken by main thread;
+		# deque operations are atomic, so neither thread waits for the other
+		self.results = deque(maxlen=maxItems)
+		# lists of strings fed to current worker, None when no more come
+		self.texts = None
+		# set on cancel, or by the worker when full
+		self.stopEvent = None
+
+	def start(self, rules):
+		import queue
+		import threading
+		self.cancel()
+		texts = self.texts = queue.Queue()
+		stopEvent = self.stopEvent = threading.Event()
+		thread = threading.Thread(
+			target=self.run, args=(rules, texts, stopEvent), name="numberProcessingPrefetcher")
+		thread.daemon = True
+		thread.start()
+
+	def feed(self, texts):
+		"""Hands strings to the worker; returns whether it takes more of them."""
+		if self.texts is None or self.stopEvent.is_set():
+			return False
+		self.texts.put(texts)
+		return True
+
+	def finish(self):
+		if self.texts is not None:
+			self.texts.put(None)
+			self.texts = None
+
+	def cancel(self):
+		if self.stopEvent is not None:
+			self.stopEvent.set()
+			self.stopEvent = None
+		# wake the worker, if waiting
+		self.finish()
+		self.results.clear()
+
+	def run(self, rules, texts, stopEvent):
+		scanner = rules.prefetchScanner
+		seen = set()
+		chars = 0
+		for batch in iter(texts.get, None):
+			for text in batch:
+				if stopEvent.is_set():
+					return
+				if text in seen or len(text) > CHUNK_LENGTH or not condExp.search(text):
+					continue
+				chars += len(text)
+				if chars > self.maxChars or len(seen) >= self.maxItems:
+					stopEvent.set()
+					return
+				seen.add(text)
+				result = scanner.process(text)
+				if not stopEvent.is_set():
+					self.results.append((rules, text, result))
+
+	def drain(self):
+		# called on main thread, the only one using transform cache
+		results = self.results
+		while results:
+			rules, text, result = results.popleft()
+			if rules is activeRules:
+				transformCache.put(rules, text, result)
+
+
+class DigitStream(object):
+	"""Joins digit runs split across adjacent string items, carrying the run pending at the end of a sequence;
+	a command between items ends the run, and so does a joined run shorter than STREAM_MIN_LEN
+	or a piece shorter than STREAM_MIN_PIECE."""
+
+	def __init__(self):
+		# length of digit run ending last sequence, that next one may continue
+		self.pendingLength = 0
+
+	def reset(self):
+		self.pendingLength = 0
+
+	def join(self, speechSequence, minLen):
+		"""
+		Moves the leading number of each string item to the previous one, when it ends with digits
+		and their run, of at least minLen digits, is long enough to be joined.
+		Returns the sequence, copied only if changed, with the digits pending before it
+		and the index of its first string item, that may continue them.
+		"""
+		minLen = max(minLen, STREAM_MIN_LEN)
+		pendingLength = self.pendingLength
+		sequence = speechSequence
+		# last string item, and the one the next item may continue, with no command after it
+		firstIndex = lastIndex = joinIndex = None
+		for index, item in enumerate(speechSequence):
+			if not isinstance(item, str) or not item:
+				if not isinstance(item, str):
+					joinIndex = None
+				if sequence is not speechSequence:
+					sequence.append(item)
+				continue
+			if joinIndex is not None and lastDigitExp.match(sequence[joinIndex], len(sequence[joinIndex])-1):
+				match = leadingNumberExp.match(item)
+				if match is not None and canJoin(
+					len(trailingDigitsExp.search(sequence[joinIndex]).group()),
+					len(leadingDigitsExp.match(item).group()), minLen
+				):
+					lead = match.group()
+					if sequence is speechSequence:
+						sequence = list(speechSequence[:index])
+					sequence[joinIndex] += lead
+					item = item[len(lead):]
+					if not item:
+						continue
+			if sequence is speechSequence:
+				lastIndex = index
+			else:
+				lastIndex = len(sequence)
+				sequence.append(item)
+			joinIndex = lastIndex
+			if firstIndex is None:
+				firstIndex = lastIndex
+		if lastIndex is not None:
+			lastItem = sequence[lastIndex]
+			match = trailingDigitsExp.search(lastItem)
+			if match is None:
+				self.pendingLength = 0
+			elif lastIndex == firstIndex and len(match.group()) == len(lastItem):
+				# a run still growing
+				self.pendingLength += len(lastItem)
+			else:
+				self.pendingLength = len(match.group())
+		if firstIndex is None or not pendingLength or not condExp.match(sequence[firstIndex]):
+			return sequence, 0, None
+		return sequence, pendingLength, firstIndex
+
+
+class UpdateCoalescer(object):
+	"""Drops sequences differing from the previous one only in their numbers,
+	like updates of progress bars, counters and clocks, when they come faster
+	than the maximum rate; the latest dropped one is spoken when the rate allows it."""
+
+	def __init__(self):
+		# previous sequence with digit runs replaced, and when it came
+		self.lastShape = None
+		self.lastTime = 0
+		self.lastSpokenTime = 0
+		# latest dropped sequence, spoken by timer
+		self.pending = None
+		self.timer = None
+		self.flushing = False
+
+	def reset(self):
+		if self.timer is not None:
+			self.timer.Stop()
+			self.timer = None
+		self.pending = None
+		self.lastShape = None
+
+	def filter(self, rules, speechSequence, now):
+		"""Returns whether speechSequence should be spoken now."""
+		if self.flushing:
+			return True
+		texts = []
+		for item in speechSequence:
+			if isinstance(item, str):
+				texts.append(item)
+			elif isinstance(item, (IndexCommand, BaseCallbackCommand)):
+				# say all, never dropped
+				return True
+		text = ''.join(texts)
+		shape = digitGroupExp.sub("#", text)
+		if shape == text:
+			# without numbers, never an update, and the dropped one is out of date
+			if self.pending is not None:
+				metrics.droppedUpdates += 1
+			self.reset()
+			return True
+		isUpdate = shape == self.lastShape and now-self.lastTime <= rules.coalesceWindow*1000000
+		self.lastShape = shape
+		self.lastTime = now
+		interval = 1000000000//rules.coalesceMaxRate
+		if not isUpdate or now-self.lastSpokenTime >= interval:
+			pending = self.pending
+			self.reset()
+			if pending is not None and isUpdate:
+				# superseded by this one
+				metrics.droppedUpdates += 1
+			elif pending is not None:
+				# final value of another thing updating, spoken before this one
+				self.speak(pending)
+			self.lastShape = shape
+			self.lastSpokenTime = now
+			return True
+		if self.pending is not None:
+			metrics.droppedUpdates += 1
+		self.pending = speechSequence
+		if self.timer is None:
+			delay = (self.lastSpokenTime+interval-now)//1000000
+			self.timer = core.callLater(max(delay, 1), self.flush)
+		return False
+
+	def flush(self):
+		self.timer = None
+		speechSequence, self.pending = self.pending, None
+		if speechSequence is not None:
+			self.speak(speechSequence)
+
+	def speak(self, speechSequence):
+		"""Speaks a dropped sequence, which is not coalesced again."""
+		self.lastSpokenTime = perf_counter_ns()
+		self.flushing = True
+		try:
+			speech.speak(speechSequence)
+		finally:
+			self.flushing = False
+
+
+class SpeechScanner(NumberScanner):
+	"""NumberScanner converting marked digit runs to speech commands."""
+
+	def __init__(self, *args, **kwargs):
+		super(SpeechScanner, self).__init__(*args, **kwargs)
+		if self.outputMode == "characterMode":
+			self.characterModeOn = CharacterModeCommand(True)
+			self.characterModeOff = CharacterModeCommand(False)
+		elif self.outputMode == "breaks":
+			self.digitBreak = BreakCommand(time=DIGIT_BREAK_TIME)
+
+	def toSpeech(self, text):
+		"""Returns speech sequence items for processed text, with marked digit runs
+		spelled in character mode or separated by breaks."""
+		items = []
+		for index, part in enumerate(markedRunExp.split(text)):
+			if not index%2:
+				# text between digit runs
+				if part:
+					items.append(part)
+			elif self.outputMode == "characterMode":
+				items.extend((self.characterModeOn, part, self.characterModeOff))
+			else:
+				groups = part.split('  ')
+				for group in groups[:-1]:
+					items.extend((group, self.digitBreak))
+				items.append(groups[-1])
+		return items
+
+
+class ProcessingRules(object):
+	"""Immutable snapshot of profile settings, with the scanners compiled from them
+	when first used, so that nothing is compiled until processing speaks or shows text in braille;
+	text prefetched in background has its own scanner, not counting digits in metrics."""
+
+	__slots__ = (
+		"profileName", "values", "_scanner", "_brailleScanner", "_prefetchScanner", "apps", "roles"
+	)+RULE_SETTINGS
+
+	def __init__(self, profileName, values):
+		object.__setattr__(self, "profileName", profileName)
+		object.__setattr__(self, "values", values)
+		for name, value in zip(RULE_SETTINGS, values):
+			object.__setattr__(self, name, value)
+		object.__setattr__(self, "_scanner", None)
+		object.__setattr__(self, "_brailleScanner", None)
+		object.__setattr__(self, "_prefetchScanner", None)
+		# sets for constant time check of focus
+		object.__setattr__(self, "apps", frozenset(app.lower() for app in self.enabledApps))
+		object.__setattr__(self, "roles", frozenset(
+			controlTypes.Role[role] for role in self.enabledRoles if role in controlTypes.Role.__members__))
+
+	def makeSpeechScanner(self, countDigits=True):
+		return SpeechScanner(
+			CURRENCY_SYMBOLS, self.userMinLen, self.outputMode, self.enabledRules, self.exceptions,
+			getGroupSizes(self.groupingMode, self.groupingPattern),
+			# Translators: read between octets of IP addresses
+			" %s "%_("dot"),
+			self.currencySymbols, self.normalizeAmounts,
+			# decimal separator of NVDA language, for amounts like 1,234
+			locale.localeconv()["decimal_point"],
+			countDigits=countDigits)
+
+	@property
+	def scanner(self):
+		scanner = self._scanner
+		if scanner is None:
+			# compiled by one thread or another, the result is the same
+			scanner = self.makeSpeechScanner()
+			object.__setattr__(self, "_scanner", scanner)
+		return scanner
+
+	@property
+	def prefetchScanner(self):
+		scanner = self._prefetchScanner
+		if scanner is None:
+			scanner = self.makeSpeechScanner(countDigits=False)
+			object.__setattr__(self, "_prefetchScanner", scanner)
+		return scanner
+
+	@property
+	def brailleScanner(self):
+		scanner = self._brailleScanner
+		if scanner is None:
+			# plain text, without words or pauses meant for speech: digits and their groups
+			# separated by a blank cell, groups of recognized numbers by two, IP addresses unchanged
+			groupSizes = getGroupSizes(self.groupingMode, self.groupingPattern)
+			scanner = NumberScanner(
+				CURRENCY_SYMBOLS, self.userMinLen, "spacing", self.enabledRules, self.exceptions,
+				groupSizes if self.outputMode != "characterMode" else (1,),
+				".", self.currencySymbols, self.normalizeAmounts, locale.localeconv()["decimal_point"],
+				groupSeparator=" ", groupPause="  ")
+			object.__setattr__(self, "_brailleScanner", scanner)
+		return scanner
+
+	def __setattr__(self, name, value):
+		raise AttributeError("%s is immutable"%type(self).__name__)
+
+
+transformCache = TransformCache(CACHE_MAX_ENTRIES, CACHE_MAX_CHARS)
+prefetcher = Prefetcher(PREFETCH_MAX_ITEMS, PREFETCH_MAX_CHARS)
+digitStream = DigitStream()
+updateCoalescer = UpdateCoalescer()
+# last focus object, with rules and decision computed for it
+focusDecision = (None, None, True)
+# compiled rules of each profile seen so far
+rulesByProfile = {}
+
+# (re)load config
+def loadConfig():
+	global myConf, activeRules
+	myConf = config.conf["numberProcessing"]
+	# lists become tuples, for immutable rules
+	values = tuple(
+		tuple(myConf[name]) if isinstance(myConf[name], list) else myConf[name]
+		for name in RULE_SETTINGS)
+	curProfile = config.conf.profiles[-1].name
+	rules = rulesByProfile.get(curProfile)
+	# recompile only when profile values changed
+	if rules is None or rules.values != values:
+		if rules is not None:
+			# processed strings of old rules are unreachable now
+			transformCache.clear()
+		rules = rulesByProfile[curProfile] = ProcessingRules(curProfile, values)
+	# single assignment, so filter never sees a half-updated state
+	activeRules = rules
+	# adjust status for current profile
+	if rules.autoEnable:
+		profileStatus[curProfile] = Status.AUTO_ENABLED
+	# adjust after disabling auto enable in settings
+	elif profileStatus.get(curProfile, Status.DISABLED) == Status.AUTO_ENABLED:
+		profileStatus[curProfile] = Status.DISABLED
+	updateFilterRegistration()
+	updateBrailleRegistration()
+
+# whether current focus is allowed by apps and roles of rules,
+# computed once per focus object, without profile switches
+def isFocusAllowed(rules):
+	global focusDecision
+	if not rules.apps and not rules.roles:
+		return True
+	import api
+	focus = api.getFocusObject()
+	lastFocus, lastRules, allowed = focusDecision
+	if focus is lastFocus and rules is lastRules:
+		return allowed
+	if focus is None:
+		allowed = False
+	else:
+		appModule = focus.appModule
+		allowed = (
+			(not rules.apps or (appModule is not None and appModule.appName.lower() in rules.apps))
+			and (not rules.roles or focus.role in rules.roles)
+		)
+	focusDecision = (focus, rules, allowed)
+	return allowed
+
+# registered only while processing is enabled,
+# so disabled status costs nothing during speech
+def filter_numberProcessing(speechSequence):
+	startTime = perf_counter_ns()
+	rules = activeRules
+	if not isFocusAllowed(rules):
+		return speechSequence
+	if prefetcher.results:
+		prefetcher.drain()
+	if speechCapture is not None:
+		speechCapture.write(speechSequence)
+	if rules.coalesceUpdates and not updateCoalescer.filter(rules, speechSequence, startTime):
+		debugLog("Speech sequence dropped as repeating update")
+		return []
+	debugLog("Initial speech sequence: %s", speechSequence)
+	continuedIndex = None
+	if rules.streaming:
+		speechSequence, pendingLength, continuedIndex = digitStream.join(speechSequence, rules.userMinLen)
+	# time spent in cache lookups and scans, the rest of the sequence time being overhead
+	transformTime = 0
+	# copied only when some item changes, otherwise the original sequence is returned
+	newSpeechSequence = None
+	for index, item in enumerate(speechSequence):
+		if not isinstance(item, str) or not condExp.search(item):
+			if newSpeechSequence is not None:
+				newSpeechSequence.append(item)
+			continue
+		debugLog("Initial item: %s", item)
+		lookupStart = perf_counter_ns()
+		processedItem = transformCache.get(rules, item)
+		lookupEnd = transformEnd = perf_counter_ns()
+		metrics.addTime("lookup", lookupEnd-lookupStart)
+		if index == continuedIndex:
+			processedItem = continueRun(rules, item, pendingLength, lookupEnd) or processedItem
+		if processedItem is None:
+			processedItem = processItem(rules, item, lookupEnd)
+			transformEnd = perf_counter_ns()
+			metrics.addTime("scan", transformEnd-lookupEnd)
+		transformTime += transformEnd-lookupStart
+		debugLog("Item after scanner: %s", processedItem)
+		if processedItem == item:
+			# keep original string
+			if newSpeechSequence is not None:
+				newSpeechSequence.append(item)
+			continue
+		metrics.rewrittenItems += 1
+		if newSpeechSequence is None:
+			newSpeechSequence = list(speechSequence[:index])
+		if rules.outputMode == "spacing":
+			newSpeechSequence.append(processedItem)
+		else:
+			newSpeechSequence.extend(rules.scanner.toSpeech(processedItem))
+	metrics.sequences += 1
+	metrics.items += len(speechSequence)
+	sequenceTime = perf_counter_ns()-startTime
+	metrics.addTime("sequence", sequenceTime)
+	metrics.addTime("overhead", sequenceTime-transformTime)
+	if newSpeechSequence is None:
+		debugLog("Speech sequence unchanged")
+		return speechSequence
+	debugLog("New speech sequence: %s", newSpeechSequence)
+	return newSpeechSequence
+
+# key of braille results in transform cache, apart from speech ones of the same rules
+def getBrailleKey(rules):
+	return (rules, "braille")
+
+def processItem(rules, item, startTime, braille=False):
+	if len(item) > rules.maxItemLength:
+		metrics.oversizedItems += 1
+		return item
+	scanner = rules.brailleScanner if braille else rules.scanner
+	# move currency signs and add whitespace around digits
+	if len(item) <= CHUNK_LENGTH:
+		processedItem = scanner.process(item)
+	else:
+		# bound the time spent on huge items
+		deadline = startTime+rules.itemTimeBudget*1000000
+		processedItem, completed = scanner.processChunks(item, deadline)
+		if not completed:
+			metrics.exceededBudgets += 1
+			# partial result, not cached
+			return processedItem
+	transformCache.put(getBrailleKey(rules) if braille else rules, item, processedItem)
+	return processedItem
+
+# whether a run of trailing digits and one of leading digits are long enough to be joined
+def canJoin(trailingLength, leadingLength, minLen):
+	return (
+		trailingLength >= STREAM_MIN_PIECE and leadingLength >= STREAM_MIN_PIECE
+		and trailingLength+leadingLength >= minLen
+	)
+
+# leading digits too short alone, but continuing the run ending last sequence
+def continueRun(rules, item, pendingLength, startTime):
+	match = continuedRunExp.match(item)
+	if match is None:
+		return None
+	lead = match.group()
+	if len(lead) >= rules.userMinLen or not canJoin(
+		pendingLength, len(lead), max(rules.userMinLen, STREAM_MIN_LEN)
+	):
+		return None
+	return rules.scanner.spell(lead)+processItem(rules, item[len(lead):], startTime)
+
+def isProcessingEnabled():
+	status = profileStatus.get(activeRules.profileName, Status.DISABLED)
+	return bool(status.value)
+
+def enableProcessing():
+	newStatus = Status.MANUAL_ENABLED
+	profileStatus[activeRules.profileName] = newStatus
+	updateFilterRegistration()
+
+def disableProcessing():
+	newStatus = Status.DISABLED
+	profileStatus[activeRules.profileName] = newStatus
+	updateFilterRegistration()
+
+def updateFilterRegistration():
+	if isProcessingEnabled() and not globalVars.appArgs.secure:
+		speech.extensions.filter_speechSequence.register(filter_numberProcessing)
+	else:
+		speech.extensions.filter_speechSequence.unregister(filter_numberProcessing)
+		# not continued once enabled again
+		digitStream.reset()
+		updateCoalescer.reset()
+
+# braille.Region.update replaced by update_numberProcessing, if registered
+originalRegionUpdate = None
+
+# registered only while braille processing is enabled, wrapping translation of each region:
+# its raw text is replaced by processed text, then positions are mapped back to raw text,
+# so that cursor, selection and routing keys still refer to the original text
+def update_numberProcessing(region):
+	startTime = perf_counter_ns()
+	rules = activeRules
+	rawText = region.rawText
+	metrics.brailleRegions += 1
+	if not rules.braille or not rawText or not condExp.search(rawText) or not isFocusAllowed(rules):
+		metrics.addTime("braille", perf_counter_ns()-startTime)
+		return originalRegionUpdate(region)
+	if prefetcher.results:
+		prefetcher.drain()
+	# in the cache shared with speech, bounding memory of both, under its own keys
+	processedText = transformCache.get(getBrailleKey(rules), rawText)
+	if processedText is None:
+		processedText = processItem(rules, rawText, startTime, braille=True)
+	if processedText == rawText:
+		metrics.addTime("braille", perf_counter_ns()-startTime)
+		return originalRegionUpdate(region)
+	metrics.rewrittenRegions += 1
+	text, rawToText, textToRaw = alignProcessedText(rawText, processedText)
+	cursorPos, selectionStart, selectionEnd = region.cursorPos, region.selectionStart, region.selectionEnd
+	typeforms = region.rawTextTypeforms
+	region.rawText = text
+	if cursorPos is not None:
+		region.cursorPos = rawToText[cursorPos]
+	if selectionStart is not None and selectionEnd is not None:
+		region.selectionStart = rawToText[selectionStart]
+		region.selectionEnd = rawToText[selectionEnd]
+	if typeforms:
+		region.rawTextTypeforms = [typeforms[pos] for pos in textToRaw]
+	translationTime = perf_counter_ns()
+	try:
+		originalRegionUpdate(region)
+	finally:
+		translationTime = perf_counter_ns()-translationTime
+		region.rawText = rawText
+		region.cursorPos, region.selectionStart, region.selectionEnd = cursorPos, selectionStart, selectionEnd
+		region.rawTextTypeforms = typeforms
+	rawToBraillePos = region.rawToBraillePos
+	region.rawToBraillePos = [rawToBraillePos[pos] for pos in rawToText[:-1]]
+	region.brailleToRawPos = [textToRaw[pos] for pos in region.brailleToRawPos]
+	metrics.addTime("braille", perf_counter_ns()-startTime-translationTime)
+
+def updateBrailleRegistration():
+	global originalRegionUpdate
+	if activeRules.braille and not globalVars.appArgs.secure:
+		if originalRegionUpdate is None:
+			import braille
+			originalRegionUpdate = braille.Region.update
+			braille.Region.update = update_numberProcessing
+	else:
+		unregisterBraille()
+
+def unregisterBraille():
+	global originalRegionUpdate
+	if originalRegionUpdate is None:
+		return
+	import braille
+	# if wrapped again by another add-on, it is left in place, passing regions through
+	if braille.Region.update is update_numberProcessing:
+		braille.Region.update = originalRegionUpdate
+		originalRegionUpdate = None
+
+def startSpeechCapture():
+	global speechCapture
+	path = os.path.join(globalVars.appArgs.configPath, "numberProcessing-%s.jsonl"%strftime("%Y%m%d-%H%M%S"))
+	speechCapture = SpeechCapture(path)
+	log.info("Number processing speech capture started: %s", path)
+
+def stopSpeechCapture():
+	global speechCapture
+	capture = speechCapture
+	speechCapture = None
+	capture.close()
+	log.info("Number processing speech capture stopped: %d sequences in %s", capture.sequences, capture.path)
+
+loadConfig()
+
+
+class GlobalPlugin(globalPluginHandler.GlobalPlugin):
+
+	scriptCategory = addonHandler.getCodeAddon().manifest["summary"]
+
+	def __init__(self, *args, **kwargs):
+		super(GlobalPlugin, self).__init__(*args, **kwargs)
+		if globalVars.appArgs.secure:
+			return
+		self.createMenu()
+		# document whose upcoming text is being prefetched, and position of next slice
+		self.prefetchedDocument = None
+		self.prefetchInfo = None
+		loadConfig()
+		config.post_configProfileSwitch.register(self.handleConfigProfileSwitch)
+		speech.extensions.speechCanceled.register(digitStream.reset)
+		speech.extensions.speechCanceled.register(updateCoalescer.reset)
+
+	def createMenu(self):
+		from gui import settingsDialogs
+		from .settingsUI import NumberProcessingSettings
+		settingsDialogs.NVDASettingsDialog.categoryClasses.append(NumberProcessingSettings)
+
+	def terminate(self):
+		global focusDecision
+		debugLog("Transform cache: %s", transformCache.getStats())
+		config.post_configProfileSwitch.unregister(self.handleConfigProfileSwitch)
+		speech.extensions.speechCanceled.unregister(digitStream.reset)
+		speech.extensions.speechCanceled.unregister(updateCoalescer.reset)
+		digitStream.reset()
+		updateCoalescer.reset()
+		if speechCapture is not None:
+			stopSpeechCapture()
+		prefetcher.cancel()
+		self.prefetchedDocument = self.prefetchInfo = None
+		profileStatus.clear()
+		updateFilterRegistration()
+		unregisterBraille()
+		transformCache.clear()
+		rulesByProfile.clear()
+		focusDecision = (None, None, True)
+		from gui import settingsDialogs
+		from .settingsUI import NumberProcessingSettings
+		settingsDialogs.NVDASettingsDialog.categoryClasses.remove(NumberProcessingSettings)
+
+	@script(
+		# Translators: Message presented in input help mode.
+		description=_("Pressed once, enables/disables digit processing; twice, launches quick settings"),
+		gesture="kb:nvda+shift+l"
+	)
+	def script_toggleDigitManager(self, gesture, repeating=False):
+		if getLastScriptRepeatCount() and not repeating:
+			self.launchQuickSettings()
+			self.script_toggleDigitManager(None, repeating=True)
+			return
+#		loadConfig()
+		if not isProcessingEnabled():
+			enableProcessing()
+			message = _("Digit processing on")
+		else:
+			disableProcessing()
+			message = _("Digit processing off")
+		if not repeating:
+			ui.message(message)
+
+	@script(
+		# Translators: Message presented in input help mode.
+		description=_("Enables/disables digit processing on braille displays"),
+	)
+	def script_toggleBrailleProcessing(self, gesture):
+		import braille
+		config.conf["numberProcessing"]["braille"] = not activeRules.braille
+		loadConfig()
+		if braille.handler is not None:
+			# show the focus again, with the new setting
+			braille.handler.initialDisplay()
+		if activeRules.braille:
+			# Translators: message presented when braille processing is enabled
+			message = _("Braille digit processing on")
+		else:
+			# Translators: message presented when braille processing is disabled
+			message = _("Braille digit processing off")
+		ui.message(message)
+
+	@script(
+		# Translators: Message presented in input help mode.
+		description=_("Starts/stops recording of processed speech to a file, for performance analysis"),
+	)
+	def script_toggleSpeechCapture(self, gesture):
+		if speechCapture is None:
+			startSpeechCapture()
+			# Translators: message presented when speech capture starts
+			message = _("Speech capture started")
+		else:
+			stopSpeechCapture()
+			# Translators: message presented when speech capture stops
+			message = _("Speech capture stopped")
+		ui.message(message)
+
+	@script(
+		# Translators: Message presented in input help mode.
+		description=_("Writes digit processing statistics to the NVDA log"),
+	)
+	def script_logMetrics(self, gesture):
+		log.info(
+			"Number processing statistics:\n%s\ntransform cache: %s",
+			metrics.getReport(),
+			transformCache.getStats())
+		# Translators: message presented after writing statistics to the log
+		ui.message(_("Digit processing statistics written to the log"))
+
+	def launchQuickSettings(self):
+		import gui
+		import wx
+
+		def run():
+			from .settingsUI import QuickSettingsDialog
+			gui.mainFrame.prePopup()
+			d = QuickSettingsDialog(None, activeRules.profileName)
+			if d:
+				d.Show()
+			gui.mainFrame.postPopup()
+		wx.CallAfter(run)
+
+	def event_gainFocus(self, obj, nextHandler):
+		nextHandler()
+		if self.prefetchedDocument is not None and obj.treeInterceptor is not self.prefetchedDocument:
+			# focus left the prefetched document
+			prefetcher.cancel()
+			self.prefetchedDocument = self.prefetchInfo = None
+		if not isProcessingEnabled():
+			return
+		# a run never continues in another control
+		digitStream.reset()
+		updateCoalescer.reset()
+		if not activeRules.prefetch or self.prefetchedDocument is not None:
+			return
+		document = obj.treeInterceptor
+		import browseMode
+		import wx
+		if isinstance(document, browseMode.BrowseModeDocumentTreeInterceptor) and document.isReady:
+			self.prefetchedDocument = document
+			# after speech of focus
+			wx.CallAfter(self.startPrefetch, document)
+
+	def startPrefetch(self, document):
+		if document is not self.prefetchedDocument:
+			return
+		import textInfos
+		try:
+			info = document.makeTextInfo(textInfos.POSITION_CARET)
+		except Exception:
+			log.debugWarning("Unable to get upcoming text of %r", document, exc_info=True)
+			return
+		self.prefetchInfo = info
+		prefetcher.start(activeRules)
+		self.prefetchSlice(info, 0, "")
+
+	def prefetchSlice(self, info, fetchedChars, partialLine):
+		"""Fetches a slice of upcoming text, then lets other events run before the next one,
+		so that main thread is never blocked for long."""
+		if info is not self.prefetchInfo:
+			return
+		import textInfos
+		import wx
+		try:
+			info.move(textInfos.UNIT_CHARACTER, PREFETCH_SLICE_CHARS, endPoint="end")
+			text = info.text
+			info.collapse(end=True)
+		except Exception:
+			log.debugWarning("Unable to get upcoming text of %r", self.prefetchedDocument, exc_info=True)
+			prefetcher.finish()
+			return
+		fetchedChars += len(text)
+		# speech items of say all are mostly lines, the last one may continue in next slice
+		lines = (partialLine+text).splitlines()
+		partialLine = lines.pop() if lines and not text.endswith(("\n", "\r")) else ""
+		if not text or fetchedChars >= PREFETCH_MAX_CHARS:
+			lines.append(partialLine)
+			prefetcher.feed(lines)
+			prefetcher.finish()
+		elif prefetcher.feed(lines):
+			wx.CallAfter(self.prefetchSlice, info, fetchedChars, partialLine)
+
+	def handleConfigProfileSwitch(self):
+		loadConfig()
@@ -0,0 +1,293 @@
+# -*- coding: UTF-8 -*-
+# NumberProcessing
+# Copyright Alberto Buffolino, released under GPL
+# Settings panel and quick settings dialog,
+# imported when the plugin registers the panel, so that importing the plugin needs no GUI module
+import addonHandler
+import config
+import controlTypes
+import wx
+
+from gui import guiHelper, nvdaControls, settingsDialogs
+from .._numberTransform import CHUNK_LENGTH, NUMBER_RULES
+from . import loadConfig
+
+
+addonHandler.initTranslation()
+
+# output modes with their labels in settings
+OUTPUT_MODES = (
+	# Translators: an output mode in settings, digits are read separately
+	("spacing", _("Spaces between digits")),
+	# Translators: an output mode in settings, digits are spelled by synthesizer
+	("characterMode", _("Character mode")),
+	# Translators: an output mode in settings, digits are read with short pauses
+	("breaks", _("Pauses between digits")),
+)
+# grouping modes with their labels in settings
+GROUPING_MODES = (
+	# Translators: a grouping mode in settings
+	("singles", _("Single digits")),
+	# Translators: a grouping mode in settings
+	("pairs", _("Pairs of digits")),
+	# Translators: a grouping mode in settings
+	("triples", _("Triples of digits")),
+	# Translators: a grouping mode in settings
+	("pattern", _("Custom pattern")),
+)
+# roles offered in settings to limit processing
+FOCUS_ROLES = (
+	"EDITABLETEXT",
+	"TERMINAL",
+	"DOCUMENT",
+	"TABLECELL",
+	"LISTITEM",
+	"STATICTEXT",
+)
+# labels in settings of NUMBER_RULES
+NUMBER_RULE_LABELS = {
+	# Translators: a number rule in settings
+	"iban": _("IBAN codes, spelled in groups of four"),
+	# Translators: a number rule in settings
+	"card": _("Card numbers, spelled in groups of four"),
+	# Translators: a number rule in settings
+	"ip": _("IP addresses, read octet by octet"),
+	# Translators: a number rule in settings
+	"dates": _("Dates, left unchanged"),
+	# Translators: a number rule in settings
+	"times": _("Times, left unchanged"),
+	# Translators: a number rule in settings
+	"phone": _("Phone numbers, spelled in groups"),
+	# Translators: a number rule in settings
+	"years": _("Years, left unchanged"),
+}
+
+
+class SettingsControls(object):
+	"""Controls of NumberProcessingSettings panel."""
+
+	def __init__(self, panel, settingsSizer):
+		self.panel = panel
+		loadConfig()
+		myConf = config.conf["numberProcessing"]
+		settingsSizerHelper = guiHelper.BoxSizerHelper(panel, sizer=settingsSizer)
+		# Translators: label for autoEnable  checkbox in settings
+		autoEnableText = _("Processing automatically enabled")
+		self.autoEnableCheckBox = settingsSizerHelper.addItem(wx.CheckBox(panel, label=autoEnableText))
+		self.autoEnableCheckBox.SetValue(myConf["autoEnable"])
+		# Translators: label for userMinLen checkbox in settings
+		userMinLenLabelText = _("Minimum number of digits to process individually")
+		self.userMinLenEdit = settingsSizerHelper.addLabeledControl(
+			userMinLenLabelText, nvdaControls.SelectOnFocusSpinCtrl, min=2, initial=myConf["userMinLen"]
+		)
+		# Translators: label for outputMode choice in settings
+		outputModeLabelText = _("Digits output")
+		self.outputModeChoice = settingsSizerHelper.addLabeledControl(
+			outputModeLabelText, wx.Choice, choices=[label for mode, label in OUTPUT_MODES]
+		)
+		self.outputModeChoice.SetSelection([mode for mode, label in OUTPUT_MODES].index(myConf["outputMode"]))
+		# Translators: label for groupingMode choice in settings
+		groupingModeLabelText = _("Digits grouping")
+		self.groupingModeChoice = settingsSizerHelper.addLabeledControl(
+			groupingModeLabelText, wx.Choice, choices=[label for mode, label in GROUPING_MODES]
+		)
+		self.groupingModeChoice.SetSelection(
+			[mode for mode, label in GROUPING_MODES].index(myConf["groupingMode"])
+		)
+		# Translators: label for groupingPattern edit box in settings
+		groupingPatternLabelText = _("Group sizes of custom pattern, like 4-4-4-4")
+		self.groupingPatternEdit = settingsSizerHelper.addLabeledControl(
+			groupingPatternLabelText, wx.TextCtrl
+		)
+		self.groupingPatternEdit.SetValue(myConf["groupingPattern"])
+		# Translators: label for list of number rules in settings
+		numberRulesLabelText = _("Recognize specific kinds of numbers")
+		self.numberRulesList = settingsSizerHelper.addLabeledControl(
+			numberRulesLabelText,
+			nvdaControls.CustomCheckListBox,
+			choices=[NUMBER_RULE_LABELS[name] for name in NUMBER_RULES],
+		)
+		self.numberRulesList.CheckedItems = [
+			index for index, name in enumerate(NUMBER_RULES) if name in myConf["enabledRules"]
+		]
+		self.numberRulesList.Select(0)
+		# Translators: label for exceptions edit box in settings
+		exceptionsLabelText = _(
+			"Numbers never processed, one per line (? matches any character, a final * any ending)"
+		)
+		self.exceptionsEdit = settingsSizerHelper.addLabeledControl(
+			exceptionsLabelText, wx.TextCtrl, style=wx.TE_MULTILINE, size=(-1, 100)
+		)
+		self.exceptionsEdit.SetValue("\n".join(myConf["exceptions"]))
+		# Translators: label for button to load exceptions from a file in settings
+		loadExceptionsText = _("&Load exceptions from file...")
+		loadExceptionsButton = settingsSizerHelper.addItem(wx.Button(panel, label=loadExceptionsText))
+		loadExceptionsButton.Bind(wx.EVT_BUTTON, self.onLoadExceptions)
+		# Translators: label for maxItemLength edit box in settings
+		maxItemLengthLabelText = _("Maximum length of text to process, in characters")
+		self.maxItemLengthEdit = settingsSizerHelper.addLabeledControl(
+			maxItemLengthLabelText,
+			nvdaControls.SelectOnFocusSpinCtrl,
+			min=CHUNK_LENGTH,
+			max=10000000,
+			initial=myConf["maxItemLength"],
+		)
+		# Translators: label for itemTimeBudget edit box in settings
+		itemTimeBudgetLabelText = _("Maximum time to process a text, in milliseconds")
+		self.itemTimeBudgetEdit = settingsSizerHelper.addLabeledControl(
+			itemTimeBudgetLabelText,
+			nvdaControls.SelectOnFocusSpinCtrl,
+			min=1,
+			max=1000,
+			initial=myConf["itemTimeBudget"],
+		)
+		# Translators: label for prefetch checkbox in settings
+		prefetchLabelText = _("Process upcoming text of web pages and documents in &background")
+		self.prefetchCheckBox = settingsSizerHelper.addItem(wx.CheckBox(panel, label=prefetchLabelText))
+		self.prefetchCheckBox.SetValue(myConf["prefetch"])
+		# Translators: label for streaming checkbox in settings
+		streamingLabelText = _("&Join numbers split across lines or formatting changes")
+		self.streamingCheckBox = settingsSizerHelper.addItem(wx.CheckBox(panel, label=streamingLabelText))
+		self.streamingCheckBox.SetValue(myConf["streaming"])
+		# Translators: label for currencySymbols edit box in settings
+		currencySymbolsLabelText = _("Other currency symbols, separated by commas (like USD, EUR, R$, kr)")
+		self.currencySymbolsEdit = settingsSizerHelper.addLabeledControl(
+			currencySymbolsLabelText, wx.TextCtrl
+		)
+		self.currencySymbolsEdit.SetValue(", ".join(myConf["currencySymbols"]))
+		# Translators: label for normalizeAmounts checkbox in settings
+		normalizeAmountsLabelText = _("Read amounts without &thousands separators")
+		self.normalizeAmountsCheckBox = settingsSizerHelper.addItem(
+			wx.CheckBox(panel, label=normalizeAmountsLabelText)
+		)
+		self.normalizeAmountsCheckBox.SetValue(myConf["normalizeAmounts"])
+		# Translators: label for coalesceUpdates checkbox in settings
+		coalesceUpdatesLabelText = _("Speak only the latest of &fast repeating updates, like progress bars")
+		self.coalesceUpdatesCheckBox = settingsSizerHelper.addItem(
+			wx.CheckBox(panel, label=coalesceUpdatesLabelText)
+		)
+		self.coalesceUpdatesCheckBox.SetValue(myConf["coalesceUpdates"])
+		# Translators: label for coalesceWindow edit box in settings
+		coalesceWindowLabelText = _("Maximum time between repeating updates, in milliseconds")
+		self.coalesceWindowEdit = settingsSizerHelper.addLabeledControl(
+			coalesceWindowLabelText,
+			nvdaControls.SelectOnFocusSpinCtrl,
+			min=100,
+			max=10000,
+			initial=myConf["coalesceWindow"],
+		)
+		# Translators: label for coalesceMaxRate edit box in settings
+		coalesceMaxRateLabelText = _("Maximum repeating updates spoken per second")
+		self.coalesceMaxRateEdit = settingsSizerHelper.addLabeledControl(
+			coalesceMaxRateLabelText,
+			nvdaControls.SelectOnFocusSpinCtrl,
+			min=1,
+			max=20,
+			initial=myConf["coalesceMaxRate"],
+		)
+		# Translators: label for braille checkbox in settings
+		brailleLabelText = _("Process numbers on &braille displays too")
+		self.brailleCheckBox = settingsSizerHelper.addItem(wx.CheckBox(panel, label=brailleLabelText))
+		self.brailleCheckBox.SetValue(myConf["braille"])
+		# Translators: label for enabledApps edit box in settings
+		enabledAppsLabelText = _("Process only in these applications, separated by commas (all if empty)")
+		self.enabledAppsEdit = settingsSizerHelper.addLabeledControl(enabledAppsLabelText, wx.TextCtrl)
+		self.enabledAppsEdit.SetValue(", ".join(myConf["enabledApps"]))
+		# Translators: label for list of control roles in settings
+		enabledRolesLabelText = _("Process only in these controls (all if none checked)")
+		self.enabledRolesList = settingsSizerHelper.addLabeledControl(
+			enabledRolesLabelText,
+			nvdaControls.CustomCheckListBox,
+			choices=[controlTypes.Role[role].displayString for role in FOCUS_ROLES],
+		)
+		self.enabledRolesList.CheckedItems = [
+			index for index, role in enumerate(FOCUS_ROLES) if role in myConf["enabledRoles"]
+		]
+		self.enabledRolesList.Select(0)
+
+	def onLoadExceptions(self, evt):
+		with wx.FileDialog(
+			self.panel,
+			# Translators: title of dialog to load exceptions from a file
+			_("Load exceptions"),
+			# Translators: file type in dialog to load exceptions
+			wildcard=_("Text files (*.txt)|*.txt|All files (*.*)|*.*"),
+			style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST,
+		) as dialog:
+			if dialog.ShowModal() != wx.ID_OK:
+				return
+			path = dialog.GetPath()
+		with open(path, encoding="utf-8", errors="replace") as f:
+			self.exceptionsEdit.SetValue(f.read())
+
+	def save(self):
+		# Update Configuration
+		myConf = config.conf["numberProcessing"]
+		myConf["autoEnable"] = self.autoEnableCheckBox.IsChecked()
+		myConf["userMinLen"] = self.userMinLenEdit.GetValue()
+		myConf["outputMode"] = OUTPUT_MODES[self.outputModeChoice.GetSelection()][0]
+		myConf["groupingMode"] = GROUPING_MODES[self.groupingModeChoice.GetSelection()][0]
+		myConf["groupingPattern"] = self.groupingPatternEdit.GetValue()
+		ruleNames = list(NUMBER_RULES)
+		myConf["enabledRules"] = [ruleNames[index] for index in self.numberRulesList.CheckedItems]
+		myConf["exceptions"] = [
+			line.strip() for line in self.exceptionsEdit.GetValue().splitlines() if line.strip()
+		]
+		myConf["maxItemLength"] = self.maxItemLengthEdit.GetValue()
+		myConf["itemTimeBudget"] = self.itemTimeBudgetEdit.GetValue()
+		myConf["prefetch"] = self.prefetchCheckBox.IsChecked()
+		myConf["streaming"] = self.streamingCheckBox.IsChecked()
+		myConf["currencySymbols"] = [
+			symbol.strip() for symbol in self.currencySymbolsEdit.GetValue().split(",") if symbol.strip()
+		]
+		myConf["normalizeAmounts"] = self.normalizeAmountsCheckBox.IsChecked()
+		myConf["coalesceUpdates"] = self.coalesceUpdatesCheckBox.IsChecked()
+		myConf["coalesceWindow"] = self.coalesceWindowEdit.GetValue()
+		myConf["coalesceMaxRate"] = self.coalesceMaxRateEdit.GetValue()
+		myConf["braille"] = self.brailleCheckBox.IsChecked()
+		myConf["enabledApps"] = [
+			app.strip() for app in self.enabledAppsEdit.GetValue().split(",") if app.strip()
+		]
+		myConf["enabledRoles"] = [FOCUS_ROLES[index] for index in self.enabledRolesList.CheckedItems]
+		# reload new config
+		loadConfig()
+
+
+class NumberProcessingSettings(settingsDialogs.SettingsPanel):
+	"""Class to define settings."""
+
+	# Translators: title of settings dialog
+	title = _("Number Processing")
+
+	def makeSettings(self, settingsSizer):
+		self.controls = SettingsControls(self, settingsSizer)
+
+	def onSave(self):
+		self.controls.save()
+
+
+class QuickSettingsDialog(wx.Dialog):
+	def __init__(self, parent, profileName):
+		if profileName is None:
+			profileName = _("normal configuration")
+		title = " - -".join([_("Number Processing Settings"), profileName])
+		super(QuickSettingsDialog, self).__init__(parent, title=title)
+		loadConfig()
+		myConf = config.conf["numberProcessing"]
+		sizerHelper = guiHelper.BoxSizerHelper(self, wx.VERTICAL)
+		# Translators: label for userMinLen edit box in settings
+		userMinLenLabelText = _("Minimum number of digits to process individually")
+		self.userMinLenEdit = sizerHelper.addLabeledControl(
+			userMinLenLabelText, nvdaControls.SelectOnFocusSpinCtrl, min=2, initial=myConf["userMinLen"]
+		)
+		sizerHelper.addDialogDismissButtons(self.CreateButtonSizer(wx.OK | wx.CANCEL))
+		self.Bind(wx.EVT_BUTTON, self.onOk, id=wx.ID_OK)
+		self.userMinLenEdit.SetFocus()
+
+	def onOk(self, evt):
+		# Update Configuration
+		myConf = config.conf["numberProcessing"]
+		myConf["userMinLen"] = self.userMinLenEdit.GetValue()
+		# reload new config
+		loadConfig()
+		self.Destroy()
@@ -56,7 +56,10 @@ addon_info = AddonInfo(
 # pythonSources = ["addon/globalPlugins/*.py"]
 # For more information on SCons Glob expressions please take a look at:
 # https://scons.org/doc/production/HTML/scons-user/apd.html
-pythonSources: list[str] = ["addon/globalPlugins/*.py"]
+pythonSources: list[str] = [
+	"addon/globalPlugins/numberProcessing/*.py",
+	"addon/globalPlugins/_numberTransform/*.py",
+]
 
 # Files that contain strings for translation. Usually your python sources
 i18nSources: list[str] = pythonSources + ["buildVars.py"]
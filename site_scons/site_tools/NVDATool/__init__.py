@@ -7,6 +7,8 @@ Builders:
 - NVDAManifest: Creates the manifest.ini file.
 - NVDATranslatedManifest: Creates the manifest.ini file with only translated information.
 - md2html: Build HTML from Markdown
+- NVDALocales: Builds .mo files, translated manifests and HTML docs of all languages in one parallel stage
+  (a method rather than a builder, as it takes language directories and Markdown files).
 
 The following environment variables are required to create the manifest:
 
@@ -23,11 +25,71 @@ The following environment variables are required to build the HTML:
 
 """
 
+import os
+
 from SCons.Script import Environment, Builder
 
 from .addon import createAddonBundleFromPath
 from .manifests import generateManifest, generateTranslatedManifest
 from .docs import md2html
+from .locales import LocaleJob, LocaleSettings, buildLocales
+
+
+def _getLocaleSettings(env: Environment) -> LocaleSettings:
+	return LocaleSettings(
+		addon_info=dict(env["addon_info"]),
+		brailleTables=env["brailleTables"],
+		symbolDictionaries=env["symbolDictionaries"],
+		speechDictionaries=env["speechDictionaries"],
+		mdExtensions=list(env["mdExtensions"]),
+	)
+
+
+def NVDALocales(env: Environment, langDirs, mdFiles, manifestTemplate, stateFile):
+	"""
+	Declares the outputs of all languages as built by one action, that builds only languages whose inputs changed.
+
+	:param langDirs: Directories of languages with a LC_MESSAGES/nvda.po catalog.
+	:param mdFiles: Markdown docs, in directories named after their language.
+	:param manifestTemplate: Template of translated manifests.
+	:param stateFile: File recording inputs of the previous build.
+	:return: Targets of all languages.
+	"""
+	manifestTemplate = env.File(manifestTemplate)
+	statePath = env.File(stateFile).abspath
+	jobs: dict[str, LocaleJob] = {}
+	for dir in langDirs:
+		jobs[dir.name] = LocaleJob(
+			lang=dir.name,
+			po=dir.File(os.path.join("LC_MESSAGES", "nvda.po")).abspath,
+			mo=dir.File(os.path.join("LC_MESSAGES", "nvda.mo")).abspath,
+			manifestTemplate=manifestTemplate.abspath,
+			manifest=dir.File("manifest.ini").abspath,
+		)
+	for mdFile in mdFiles:
+		lang = mdFile.dir.name
+		job = jobs.get(lang, LocaleJob(lang=lang, po=None, mo=None, manifestTemplate=None, manifest=None))
+		htmlFile = mdFile.target_from_source("", ".html")
+		jobs[lang] = job._replace(docs=job.docs + ((mdFile.abspath, htmlFile.abspath),))
+	sortedJobs = [jobs[lang] for lang in sorted(jobs)]
+	localesAction = env.Action(
+		lambda target, source, env: buildLocales(sortedJobs, _getLocaleSettings(env), statePath) and None,
+		lambda target,
+		source,
+		env: f"Building translations and docs of changed languages, out of {len(sortedJobs)}",
+	)
+	targets = env.Command(
+		[path for job in sortedJobs for path in job.targets],
+		[path for job in sortedJobs for path in job.sources]
+		# rebuilds when build variables change, like the version of a dev build
+		+ [env.Value(_getLocaleSettings(env).getDigest())],
+		localesAction,
+	)
+	# Outputs of languages not built again are kept.
+	env.Precious(targets)
+	env.SideEffect(statePath, targets)
+	env.Clean(targets, statePath)
+	return targets
 
 
 def generate(env: Environment):
@@ -109,6 +171,8 @@ def generate(env: Environment):
 		src_suffix=".md",
 	)
 
+	env.AddMethod(NVDALocales)
+
 
 def exists():
 	return True
@@ -1,23 +1,294 @@
+import hashlib
+import json
+import os
+import re
+import struct
 import zipfile
+import zlib
 from collections.abc import Iterable
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 
+# Fixed timestamp of all entries (1980-01-01 00:00, the earliest a zip can store),
+# so that identical inputs give byte-identical bundles.
+ENTRY_DOS_TIME = 0
+ENTRY_DOS_DATE = (1 << 5) | 1
+# Regular file, readable by everyone, in the upper half of external attributes.
+ENTRY_EXTERNAL_ATTR = (0o100644 << 16) & 0xFFFFFFFF
+# Names are stored as UTF-8.
+ENTRY_FLAGS = 0x800
+ZIP_VERSION = 20
+# Made by a Unix system, so that external attributes hold a file mode.
+ZIP_MADE_BY = (3 << 8) | ZIP_VERSION
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+END_RECORD = struct.Struct("<IHHHHIIH")
+LOCAL_HEADER_SIGNATURE = 0x04034B50
+CENTRAL_HEADER_SIGNATURE = 0x02014B50
+END_RECORD_SIGNATURE = 0x06054B50
+READ_BLOCK_SIZE = 1024 * 1024
+MANIFEST_VERSION = 1
+# Bytecode caches of Python, never part of a bundle whatever the exclude patterns.
+CACHE_DIR_NAME = "__pycache__"
 
-def matchesNoPatterns(path: Path, patterns: Iterable[str]) -> bool:
-	"""Checks if the path, the first argument, does not match any of the patterns passed as the second argument."""
-	return not any((path.match(pattern) for pattern in patterns))
+
+def _translateGlobPart(part: str) -> str:
+	"""Translates a glob path part to a regular expression, whose wildcards never match a separator."""
+	result: list[str] = []
+	i = 0
+	while i < len(part):
+		c = part[i]
+		i += 1
+		if c == "*":
+			result.append("[^/]*")
+		elif c == "?":
+			result.append("[^/]")
+		elif c == "[":
+			# as fnmatch does, a ] right after [ or [! is part of the set
+			end = i
+			if part[end : end + 1] == "!":
+				end += 1
+			if part[end : end + 1] == "]":
+				end += 1
+			end = part.find("]", end)
+			if end < 0:
+				result.append(re.escape(c))
+				continue
+			chars = re.sub(r"([\\\[\]&~|])", r"\\\1", part[i:end])
+			i = end + 1
+			if not chars:
+				result.append("(?!)")
+			elif chars == "!":
+				result.append("[^/]")
+			elif chars.startswith("!"):
+				result.append(f"(?!/)[^{chars[1:]}]")
+			else:
+				result.append(f"[{chars}]" if chars[0] != "^" else f"[\\{chars}]")
+		else:
+			result.append(re.escape(c))
+	return "".join(result)
+
+
+def compileExcludePatterns(patterns: Iterable[str]) -> re.Pattern[str] | None:
+	"""
+	Compiles exclude patterns in a single expression, matched against posix relative paths
+	as Path.match does: relative patterns match from the right, whole path parts at a time.
+
+	:param patterns: Glob patterns, like *.pyc or doc/*.md.
+	:return: The expression, or None if there are no patterns that can match a relative path.
+	"""
+	alternatives: list[str] = []
+	for pattern in patterns:
+		if not pattern:
+			raise ValueError("empty exclude pattern")
+		posixPattern = pattern.replace(os.sep, "/")
+		if posixPattern.startswith("/") or re.match(r"[A-Za-z]:", posixPattern):
+			# absolute patterns never match a path inside the bundle
+			continue
+		parts = [part for part in posixPattern.split("/") if part and part != "."]
+		alternatives.append("/".join(_translateGlobPart(part) for part in parts))
+	if not alternatives:
+		return None
+	flags = re.IGNORECASE if os.name == "nt" else 0
+	return re.compile(f"(?:^|/)(?:{'|'.join(alternatives)})$", flags)
+
+
+def _iterBundleFiles(basedir: Path, excludeMatcher: re.Pattern[str] | None) -> list[tuple[str, str]]:
+	"""
+	:return: Posix path in bundle and file system path of files not excluded, sorted by path in bundle;
+		bytecode caches are left out.
+	"""
+	files: list[tuple[str, str]] = []
+	for dirpath, dirnames, filenames in os.walk(basedir):
+		dirnames[:] = [name for name in dirnames if name != CACHE_DIR_NAME]
+		relDir = PurePosixPath(Path(dirpath).relative_to(basedir))
+		for name in filenames:
+			pathInBundle = (relDir / name).as_posix()
+			if excludeMatcher is None or not excludeMatcher.search(pathInBundle):
+				files.append((pathInBundle, os.path.join(dirpath, name)))
+	files.sort()
+	return files
+
+
+def _hashFile(path: str) -> str:
+	digest = hashlib.sha256()
+	with open(path, "rb") as f:
+		while block := f.read(READ_BLOCK_SIZE):
+			digest.update(block)
+	return digest.hexdigest()
+
+
+def _manifestPath(dest: str | Path) -> Path:
+	"""The manifest of a bundle is stored next to it."""
+	dest = Path(dest)
+	return dest.with_name(dest.name + ".manifest.json")
+
+
+def _loadManifest(dest: str | Path) -> dict[str, list]:
+	"""
+	:return: Size, modification time, SHA-256 and CRC-32 of entries in the previous bundle, by path in bundle;
+		empty if there is no usable manifest or previous bundle.
+	"""
+	if not os.path.isfile(dest):
+		return {}
+	try:
+		with open(_manifestPath(dest), encoding="utf-8") as f:
+			manifest = json.load(f)
+	except (OSError, ValueError):
+		return {}
+	if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+		return {}
+	return manifest.get("entries", {})
+
+
+def _readRawEntry(archive, info: zipfile.ZipInfo) -> bytes:
+	"""Reads the compressed bytes of an entry, as stored in an open archive file."""
+	archive.seek(info.header_offset)
+	header = LOCAL_HEADER.unpack(archive.read(LOCAL_HEADER.size))
+	if header[0] != LOCAL_HEADER_SIGNATURE:
+		raise zipfile.BadZipFile(f"bad local header of {info.filename}")
+	nameLength, extraLength = header[9], header[10]
+	archive.seek(nameLength + extraLength, os.SEEK_CUR)
+	data = archive.read(info.compress_size)
+	if len(data) != info.compress_size:
+		raise zipfile.BadZipFile(f"truncated entry {info.filename}")
+	return data
+
+
+def _compressFile(path: str) -> tuple[bytes, int, int, int]:
+	"""
+	:return: Raw deflate data, CRC-32 and size of the file, and its compression method.
+	"""
+	with open(path, "rb") as f:
+		data = f.read()
+	crc = zlib.crc32(data)
+	compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+	compressed = compressor.compress(data) + compressor.flush()
+	if len(compressed) >= len(data):
+		return data, crc, len(data), zipfile.ZIP_STORED
+	return compressed, crc, len(data), zipfile.ZIP_DEFLATED
+
+
+class _ZipWriter:
+	"""Writes entries already compressed, with fixed timestamps and attributes."""
+
+	def __init__(self, f):
+		self.f = f
+		self.offset = 0
+		self.centralDirectory: list[bytes] = []
+
+	def write(self, name: str, data: bytes, crc: int, size: int, method: int):
+		encodedName = name.encode("utf-8")
+		if size > 0xFFFFFFFF or self.offset > 0xFFFFFFFF:
+			raise zipfile.LargeZipFile(f"{name} needs zip64, not supported in add-on bundles")
+		header = LOCAL_HEADER.pack(
+			LOCAL_HEADER_SIGNATURE,
+			ZIP_VERSION,
+			ENTRY_FLAGS,
+			method,
+			ENTRY_DOS_TIME,
+			ENTRY_DOS_DATE,
+			crc,
+			len(data),
+			size,
+			len(encodedName),
+			0,
+		)
+		self.centralDirectory.append(
+			CENTRAL_HEADER.pack(
+				CENTRAL_HEADER_SIGNATURE,
+				ZIP_MADE_BY,
+				ZIP_VERSION,
+				ENTRY_FLAGS,
+				method,
+				ENTRY_DOS_TIME,
+				ENTRY_DOS_DATE,
+				crc,
+				len(data),
+				size,
+				len(encodedName),
+				0,
+				0,
+				0,
+				0,
+				ENTRY_EXTERNAL_ATTR,
+				self.offset,
+			)
+			+ encodedName,
+		)
+		self.f.write(header)
+		self.f.write(encodedName)
+		self.f.write(data)
+		self.offset += len(header) + len(encodedName) + len(data)
+
+	def close(self):
+		centralDirectory = b"".join(self.centralDirectory)
+		count = len(self.centralDirectory)
+		if count > 0xFFFF:
+			raise zipfile.LargeZipFile("too many entries for an add-on bundle")
+		self.f.write(centralDirectory)
+		self.f.write(
+			END_RECORD.pack(END_RECORD_SIGNATURE, 0, 0, count, count, len(centralDirectory), self.offset, 0),
+		)
 
 
 def createAddonBundleFromPath(path: str | Path, dest: str, excludePatterns: Iterable[str]):
-	"""Creates a bundle from a directory that contains an addon manifest file."""
+	"""
+	Creates a bundle from a directory that contains an addon manifest file.
+
+	Entries are sorted, with fixed timestamps, so identical inputs give byte-identical bundles.
+	A manifest of content hashes is kept next to the bundle: files unchanged since the previous build
+	are copied compressed from the previous bundle, instead of being compressed again.
+	"""
 	if isinstance(path, str):
 		path = Path(path)
 	basedir = path.absolute()
-	with zipfile.ZipFile(dest, "w", zipfile.ZIP_DEFLATED) as z:
-		for p in basedir.rglob("*"):
-			if p.is_dir():
-				continue
-			pathInBundle = p.relative_to(basedir)
-			if matchesNoPatterns(pathInBundle, excludePatterns):
-				z.write(p, pathInBundle)
+	files = _iterBundleFiles(basedir, compileExcludePatterns(excludePatterns))
+	previousEntries = _loadManifest(dest)
+	entries: dict[str, list] = {}
+	previousInfos: dict[str, zipfile.ZipInfo] = {}
+	tempDest = f"{dest}.tmp"
+	previous = None
+	try:
+		if previousEntries:
+			try:
+				previous = open(dest, "rb")
+				previousInfos = {info.filename: info for info in zipfile.ZipFile(previous).infolist()}
+			except (OSError, zipfile.BadZipFile):
+				pass
+		with open(tempDest, "wb") as f:
+			writer = _ZipWriter(f)
+			for pathInBundle, filePath in files:
+				stat = os.stat(filePath)
+				known = previousEntries.get(pathInBundle)
+				if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+					# size and modification time unchanged, so is content
+					digest = known[2]
+				else:
+					digest = _hashFile(filePath)
+				info = previousInfos.get(pathInBundle) if known and known[2] == digest else None
+				# the CRC ties the manifest entry to the previous bundle it was written with
+				if info is not None and info.CRC == known[3] and info.file_size == stat.st_size:
+					crc = info.CRC
+					writer.write(
+						pathInBundle,
+						_readRawEntry(previous, info),
+						crc,
+						info.file_size,
+						info.compress_type,
+					)
+				else:
+					data, crc, size, method = _compressFile(filePath)
+					writer.write(pathInBundle, data, crc, size, method)
+				entries[pathInBundle] = [stat.st_size, stat.st_mtime_ns, digest, crc]
+			writer.close()
+	except BaseException:
+		if os.path.exists(tempDest):
+			os.remove(tempDest)
+		raise
+	finally:
+		if previous is not None:
+			previous.close()
+	os.replace(tempDest, dest)
+	with open(_manifestPath(dest), "w", encoding="utf-8") as f:
+		json.dump({"version": MANIFEST_VERSION, "entries": entries}, f, indent="\t", sort_keys=True)
 	return dest
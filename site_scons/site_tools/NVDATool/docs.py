@@ -13,7 +13,12 @@ def md2html(
 	moFile: str | Path | None,
 	mdExtensions: list[str],
 	addon_info: AddonInfo,
+	translations: gettext.NullTranslations | None = None,
 ):
+	"""
+	Builds an HTML doc from a Markdown file, with the add-on summary translated as title.
+	Translations already parsed, if given, are used instead of moFile.
+	"""
 	if isinstance(source, str):
 		source = Path(source)
 	if isinstance(dest, str):
@@ -22,8 +27,10 @@ def md2html(
 		moFile = Path(moFile)
 
 	try:
-		with moFile.open("rb") as f:
-			_ = gettext.GNUTranslations(f).gettext
+		if translations is None:
+			with moFile.open("rb") as f:
+				translations = gettext.GNUTranslations(f)
+		_ = translations.gettext
 	except Exception:
 		summary = addon_info["addon_summary"]
 	else:
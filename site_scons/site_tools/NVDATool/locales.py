@@ -0,0 +1,262 @@
+"""
+Builds the translated files of each language in one stage: the gettext .mo file compiled in-process from the .po
+file, the translated manifest and the HTML docs. Each catalog is parsed once, and its translations are shared by
+the manifest and docs. Languages are built across a pool of processes, and only languages whose inputs
+changed since the previous build, as recorded in a state file, are built again.
+"""
+
+import array
+import ast
+import gettext
+import hashlib
+import io
+import json
+import os
+import site
+import struct
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, NamedTuple
+
+from .docs import md2html
+from .manifests import generateTranslatedManifest
+
+MO_MAGIC = 0x950412DE
+# Bump to build every language again, when outputs change for the same inputs.
+STATE_VERSION = 1
+
+
+class LocaleJob(NamedTuple):
+	"""Inputs and outputs of a language; a language without catalog has only docs."""
+
+	lang: str
+	po: str | None
+	mo: str | None
+	manifestTemplate: str | None
+	manifest: str | None
+	# Markdown sources and HTML outputs
+	docs: tuple[tuple[str, str], ...] = ()
+
+	@property
+	def sources(self) -> list[str]:
+		return [path for path in (self.po, self.manifestTemplate) if path] + [md for md, _html in self.docs]
+
+	@property
+	def targets(self) -> list[str]:
+		return [path for path in (self.mo, self.manifest) if path] + [html for _md, html in self.docs]
+
+
+class LocaleSettings(NamedTuple):
+	"""Build variables the outputs of every language depend on."""
+
+	addon_info: dict[str, Any]
+	brailleTables: dict[str, Any]
+	symbolDictionaries: dict[str, Any]
+	speechDictionaries: dict[str, Any]
+	mdExtensions: list[str]
+
+	def getDigest(self) -> str:
+		return hashlib.sha256(json.dumps(self, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def getCharset(header: str) -> str | None:
+	"""
+	:param header: Translation of the empty id, with lines like "Content-Type: text/plain; charset=UTF-8".
+	:return: Charset of the Content-Type line, if any.
+	"""
+	for line in header.splitlines():
+		key, _sep, value = line.partition(":")
+		if key.strip().lower() == "content-type" and "charset=" in value:
+			return value.split("charset=")[1].strip()
+	return None
+
+
+def parsePo(data: bytes) -> dict[bytes, bytes]:
+	"""
+	Parses a gettext catalog as msgfmt does: untranslated messages are left out, and so are fuzzy ones
+	except for the header; messages with context are keyed by context and id, separated by EOT,
+	and plural forms are separated by NUL.
+
+	:param data: Contents of the .po file.
+	:return: Translations by id, encoded in the charset of the catalog.
+	"""
+	messages: dict[bytes, bytes] = {}
+	# until the header tells otherwise
+	encoding = "latin-1"
+	section: str | None = None
+	ctxt: bytes | None = None
+	msgid = msgidPlural = b""
+	msgstr: dict[int, bytes] = {}
+	fuzzy = False
+	index = 0
+
+	def add():
+		isHeader = not msgid and ctxt is None
+		if not any(msgstr.values()) or (fuzzy and not isHeader):
+			return
+		key = msgid + (b"\0" + msgidPlural if msgidPlural else b"")
+		if ctxt is not None:
+			key = ctxt + b"\x04" + key
+		messages[key] = b"\0".join(msgstr[index] for index in sorted(msgstr))
+
+	for lineNumber, rawLine in enumerate(data.splitlines(), 1):
+		line = rawLine.decode(encoding).strip()
+		if line.startswith("#"):
+			if section == "msgstr":
+				add()
+				section = None
+				ctxt, msgid, msgidPlural, msgstr, fuzzy = None, b"", b"", {}, False
+			if line.startswith("#,") and "fuzzy" in line:
+				fuzzy = True
+			continue
+		if not line:
+			continue
+		keyword, _sep, rest = line.partition(" ")
+		if keyword in ("msgctxt", "msgid") and section == "msgstr":
+			add()
+			ctxt, msgid, msgidPlural, msgstr, fuzzy = None, b"", b"", {}, False
+		if keyword == "msgctxt":
+			section, ctxt = "msgctxt", b""
+		elif keyword == "msgid":
+			section = "msgid"
+		elif keyword == "msgid_plural":
+			section = "msgid_plural"
+		elif keyword.startswith("msgstr"):
+			section = "msgstr"
+			index = int(keyword[7:-1]) if keyword.startswith("msgstr[") else 0
+			msgstr[index] = b""
+		else:
+			# continuation of the current string
+			rest = line
+		if not rest.startswith('"'):
+			raise ValueError(f"syntax error at line {lineNumber}: {line}")
+		text = ast.literal_eval(rest).encode(encoding)
+		if section == "msgctxt":
+			ctxt += text
+		elif section == "msgid":
+			msgid += text
+		elif section == "msgid_plural":
+			msgidPlural += text
+		elif section == "msgstr":
+			msgstr[index] += text
+			if not msgid and ctxt is None:
+				# the header charset applies from the next line, which may be the first of the next message
+				encoding = getCharset(msgstr[index].decode(encoding)) or encoding
+		else:
+			raise ValueError(f"syntax error at line {lineNumber}: {line}")
+	if section == "msgstr":
+		add()
+	return messages
+
+
+def generateMo(messages: dict[bytes, bytes]) -> bytes:
+	"""Generates a .mo file, with messages sorted by id and without hash table, as Python's msgfmt does."""
+	keys = sorted(messages)
+	keyStart = 7 * 4 + 16 * len(keys)
+	idsLength = sum(len(key) + 1 for key in keys)
+	keyOffsets: list[int] = []
+	valueOffsets: list[int] = []
+	idOffset = strOffset = 0
+	for key in keys:
+		keyOffsets += [len(key), keyStart + idOffset]
+		valueOffsets += [len(messages[key]), keyStart + idsLength + strOffset]
+		idOffset += len(key) + 1
+		strOffset += len(messages[key]) + 1
+	header = struct.pack("Iiiiiii", MO_MAGIC, 0, len(keys), 7 * 4, 7 * 4 + len(keys) * 8, 0, 0)
+	return b"".join(
+		(
+			header,
+			array.array("i", keyOffsets + valueOffsets).tobytes(),
+			b"".join(key + b"\0" for key in keys),
+			b"".join(messages[key] + b"\0" for key in keys),
+		),
+	)
+
+
+def buildLocale(job: LocaleJob, settings: LocaleSettings) -> str:
+	"""Builds the outputs of a language, parsing its catalog once."""
+	translations: gettext.NullTranslations | None = None
+	if job.po:
+		with open(job.po, "rb") as f:
+			mo = generateMo(parsePo(f.read()))
+		with open(job.mo, "wb") as f:
+			f.write(mo)
+		translations = gettext.GNUTranslations(io.BytesIO(mo))
+		generateTranslatedManifest(
+			job.manifestTemplate,
+			job.manifest,
+			translations=translations,
+			addon_info=settings.addon_info,
+			brailleTables=settings.brailleTables,
+			symbolDictionaries=settings.symbolDictionaries,
+			speechDictionaries=settings.speechDictionaries,
+		)
+	for md, html in job.docs:
+		md2html(
+			md,
+			html,
+			moFile=None,
+			translations=translations,
+			mdExtensions=settings.mdExtensions,
+			addon_info=settings.addon_info,
+		)
+	return job.lang
+
+
+def getLocaleDigest(job: LocaleJob, settingsDigest: str) -> str:
+	"""Hashes the inputs of a language: its files and the build variables."""
+	digest = hashlib.sha256(settingsDigest.encode("ascii"))
+	digest.update(repr(job).encode("utf-8"))
+	for path in job.sources:
+		with open(path, "rb") as f:
+			digest.update(hashlib.sha256(f.read()).digest())
+	return digest.hexdigest()
+
+
+def _loadState(statePath: str) -> dict[str, str]:
+	try:
+		with open(statePath, encoding="utf-8") as f:
+			state = json.load(f)
+	except (OSError, ValueError):
+		return {}
+	if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+		return {}
+	return state.get("locales", {})
+
+
+def buildLocales(
+	jobs: Iterable[LocaleJob],
+	settings: LocaleSettings,
+	statePath: str,
+	workers: int | None = None,
+) -> list[str]:
+	"""
+	Builds languages whose inputs changed since the previous build, or whose outputs are missing.
+
+	:param jobs: Languages to build.
+	:param settings: Build variables.
+	:param statePath: File recording input digests of the previous build.
+	:param workers: Processes to build across; by default, one per CPU.
+	:return: Languages built.
+	"""
+	jobs = list(jobs)
+	previousDigests = _loadState(statePath)
+	settingsDigest = settings.getDigest()
+	digests = {job.lang: getLocaleDigest(job, settingsDigest) for job in jobs}
+	outdated = [
+		job
+		for job in jobs
+		if previousDigests.get(job.lang) != digests[job.lang]
+		or not all(os.path.isfile(path) for path in job.targets)
+	]
+	workers = min(workers or os.cpu_count() or 1, len(outdated))
+	if workers <= 1:
+		built = [buildLocale(job, settings) for job in outdated]
+	else:
+		# spawned workers import this module again, but SCons takes site_tools off sys.path once loaded
+		siteTools = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+		with ProcessPoolExecutor(workers, initializer=site.addsitedir, initargs=(siteTools,)) as executor:
+			built = list(executor.map(buildLocale, outdated, [settings] * len(outdated)))
+	with open(statePath, "w", encoding="utf-8") as f:
+		json.dump({"version": STATE_VERSION, "locales": digests}, f, indent="\t", sort_keys=True)
+	return built
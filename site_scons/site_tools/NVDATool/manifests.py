@@ -39,14 +39,18 @@ def generateTranslatedManifest(
 	source: str,
 	dest: str,
 	*,
-	mo: str,
+	mo: str | None = None,
+	translations: gettext.NullTranslations | None = None,
 	addon_info: AddonInfo,
 	brailleTables: BrailleTables,
 	symbolDictionaries: SymbolDictionaries,
 	speechDictionaries: SpeechDictionaries,
 ):
-	with open(mo, "rb") as f:
-		_ = gettext.GNUTranslations(f).gettext
+	# Translations already parsed, if given, are used instead of the mo file.
+	if translations is None:
+		with open(mo, "rb") as f:
+			translations = gettext.GNUTranslations(f)
+	_ = translations.gettext
 	vars: dict[str, str] = {}
 	for var in ("addon_summary", "addon_description", "addon_changelog"):
 		vars[var] = _(addon_info[var])
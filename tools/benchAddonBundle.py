@@ -0,0 +1,122 @@
+# Copyright Alberto Buffolino, released under GPL
+# Benchmark of the add-on bundler on a synthetic tree: cold build, incremental builds, and the plain zipfile
+# bundler it replaced; also checks that bundles are byte-identical across builds.
+# Usage: python tools/benchAddonBundle.py [--files N] [--changed N]
+
+import argparse
+import importlib.util
+import os
+import random
+import shutil
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+ADDON_MODULE = Path(__file__).resolve().parent.parent / "site_scons" / "site_tools" / "NVDATool" / "addon.py"
+EXCLUDE_PATTERNS = ["*.pyc", "*.bak", "doc/*/*.tmp"]
+
+
+def loadBundler():
+	"""Loads the bundler module alone, as the NVDATool package needs SCons."""
+	spec = importlib.util.spec_from_file_location("addonBundler", ADDON_MODULE)
+	module = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(module)
+	return module
+
+
+def generateTree(root: Path, files: int, seed: int = 1) -> list[Path]:
+	"""
+	Writes a tree like a large add-on: sources, locale catalogs, docs and some binary files.
+
+	:return: Paths of written files.
+	"""
+	rnd = random.Random(seed)
+	written: list[Path] = []
+	for index in range(files):
+		kind = index % 10
+		if kind < 5:
+			path = root / "globalPlugins" / f"package{index % 20}" / f"module{index}.py"
+			data = "".join(
+				f"def function{n}(value):\n\treturn value * {n}\n\n" for n in range(rnd.randint(5, 200))
+			)
+		elif kind < 8:
+			path = root / "locale" / f"lang{index % 60}" / "LC_MESSAGES" / f"catalog{index}.po"
+			data = "".join(
+				f'msgid "message {n}"\nmsgstr "messaggio {n}"\n\n' for n in range(rnd.randint(5, 300))
+			)
+		elif kind == 8:
+			path = root / "doc" / f"lang{index % 60}" / f"page{index}.html"
+			data = "<p>" + " ".join(rnd.choice(("number", "digit", "group")) for _ in range(2000)) + "</p>\n"
+		else:
+			path = root / "lib" / f"blob{index}.bin"
+			data = None
+		path.parent.mkdir(parents=True, exist_ok=True)
+		if data is None:
+			path.write_bytes(rnd.randbytes(rnd.randint(1000, 20000)))
+		else:
+			path.write_text(data, encoding="utf-8")
+		written.append(path)
+	(root / "globalPlugins" / "stale.pyc").write_bytes(b"\0" * 100)
+	return written
+
+
+def plainBundle(path: Path, dest: Path, excludePatterns: list[str]):
+	"""The bundler before the incremental one: every file compressed again, in file system order."""
+	with zipfile.ZipFile(dest, "w", zipfile.ZIP_DEFLATED) as z:
+		for p in path.rglob("*"):
+			if p.is_dir():
+				continue
+			pathInBundle = p.relative_to(path)
+			if not any(pathInBundle.match(pattern) for pattern in excludePatterns):
+				z.write(p, pathInBundle)
+
+
+def timeIt(function, *args) -> float:
+	start = time.perf_counter()
+	function(*args)
+	return time.perf_counter() - start
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark the incremental add-on bundler.")
+	parser.add_argument("--files", type=int, default=5000, help="files in the synthetic tree")
+	parser.add_argument("--changed", type=int, default=20, help="files changed before the incremental build")
+	args = parser.parse_args()
+
+	bundler = loadBundler()
+	workDir = Path(tempfile.mkdtemp(prefix="benchAddonBundle"))
+	try:
+		source = workDir / "addon"
+		files = generateTree(source, args.files)
+		bundle = workDir / "bench.nvda-addon"
+		otherBundle = workDir / "other.nvda-addon"
+		create = bundler.createAddonBundleFromPath
+		print(f"{len(files)} files, {sum(f.stat().st_size for f in files) / 1e6:.1f}MB")
+		results = [
+			("plain zipfile", timeIt(plainBundle, source, workDir / "plain.nvda-addon", EXCLUDE_PATTERNS)),
+			("cold", timeIt(create, source, str(bundle), EXCLUDE_PATTERNS)),
+			("unchanged", timeIt(create, source, str(bundle), EXCLUDE_PATTERNS)),
+		]
+		for path in random.Random(2).sample(files, min(args.changed, len(files))):
+			with open(path, "ab") as f:
+				f.write(b"\n# changed\n")
+		results.append((f"{args.changed} changed", timeIt(create, source, str(bundle), EXCLUDE_PATTERNS)))
+		for path in files[: args.changed]:
+			os.utime(path)
+		results.append((f"{args.changed} touched", timeIt(create, source, str(bundle), EXCLUDE_PATTERNS)))
+		create(source, str(otherBundle), EXCLUDE_PATTERNS)
+		baseline = results[0][1]
+		print(f"{'build':>16} {'seconds':>9} {'speedup':>8}")
+		for name, seconds in results:
+			print(f"{name:>16} {seconds:>9.3f} {baseline / seconds:>8.2f}")
+		identical = bundle.read_bytes() == otherBundle.read_bytes()
+		print(f"incremental and cold bundles byte-identical: {identical}")
+		if not identical:
+			raise SystemExit(1)
+	finally:
+		shutil.rmtree(workDir)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,55 @@
+# Copyright Alberto Buffolino, released under GPL
+# Scaling benchmark of the batch transform, across numbers of worker processes.
+# Usage: python tools/benchBatch.py [--items N] [--max-workers N]
+
+import argparse
+import os
+import sys
+import time
+
+from benchNumberProcessing import CORPORA, generateCorpus
+from nvdaStandIns import PLUGINS_DIR
+
+sys.path.insert(0, str(PLUGINS_DIR))
+from _numberTransform.batch import TransformSettings, transformBatch  # noqa: E402
+
+
+def workerCounts(maxWorkers: int) -> list[int]:
+	"""
+	:param maxWorkers: Highest number of workers.
+	:return: Powers of two below maxWorkers, followed by maxWorkers.
+	"""
+	counts = [1]
+	while counts[-1] * 2 < maxWorkers:
+		counts.append(counts[-1] * 2)
+	if counts[-1] != maxWorkers:
+		counts.append(maxWorkers)
+	return counts
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark the batch number transform across worker counts.")
+	parser.add_argument("--items", type=int, default=500000, help="number of strings to transform")
+	parser.add_argument(
+		"--max-workers", type=int, default=os.cpu_count() or 1, help="highest number of workers"
+	)
+	args = parser.parse_args()
+
+	corpus = [item for name in CORPORA if name != "adversarial" for item in generateCorpus(name)]
+	items = (corpus * (args.items // len(corpus) + 1))[: args.items]
+	chars = sum(len(item) for item in items)
+	settings = TransformSettings(minLen=2)
+	print(f"{len(items)} items, {chars} chars, {os.cpu_count()} CPUs")
+	print(f"{'workers':>8} {'seconds':>9} {'items/s':>10} {'speedup':>8}")
+	baseline = None
+	for workers in workerCounts(args.max_workers):
+		start = time.perf_counter()
+		for _ in transformBatch(items, settings, workers=workers):
+			pass
+		seconds = time.perf_counter() - start
+		baseline = baseline or seconds
+		print(f"{workers:>8} {seconds:>9.3f} {len(items) / seconds:>10.0f} {baseline / seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+	main()
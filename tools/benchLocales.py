@@ -0,0 +1,135 @@
+# Copyright Alberto Buffolino, released under GPL
+# Benchmark of the locale build stage on synthetic languages: the previous serial build, with a msgfmt process
+# per language and each catalog parsed again by manifest and docs, against the parallel in-process stage,
+# cold and incremental. Needs the build requirements (SCons, Markdown); msgfmt is used if found.
+# Usage: python tools/benchLocales.py [--locales N] [--messages N] [--workers N]
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "site_scons" / "site_tools"))
+sys.dont_write_bytecode = True
+sys.path.insert(0, str(ROOT))
+import buildVars  # noqa: E402
+from NVDATool.docs import md2html  # noqa: E402
+from NVDATool.locales import LocaleJob, LocaleSettings, buildLocales, generateMo, parsePo  # noqa: E402
+from NVDATool.manifests import generateTranslatedManifest  # noqa: E402
+
+WORDS = ("number", "digit", "group", "speech", "braille", "currency", "setting", "dialog")
+
+
+def generateLocales(root: Path, locales: int, messages: int, seed: int = 1) -> list[LocaleJob]:
+	"""Writes a catalog and a Markdown doc per synthetic language."""
+	rnd = random.Random(seed)
+	sourceMessages = [buildVars.addon_info[key] for key in ("addon_summary", "addon_description")]
+	sourceMessages += [
+		" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(2, 12))) for _ in range(messages)
+	]
+	template = root / "manifest-translated.ini.tpl"
+	shutil.copy(ROOT / "manifest-translated.ini.tpl", template)
+	jobs: list[LocaleJob] = []
+	for index in range(locales):
+		lang = f"x{index:03d}"
+		localeDir = root / "locale" / lang
+		docDir = root / "doc" / lang
+		(localeDir / "LC_MESSAGES").mkdir(parents=True)
+		docDir.mkdir(parents=True)
+		entries = ['msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n']
+		entries += [f'msgid "{message}"\nmsgstr "{lang} {message[::-1]}"\n' for message in sourceMessages]
+		(localeDir / "LC_MESSAGES" / "nvda.po").write_text("\n".join(entries), encoding="utf-8")
+		paragraphs = [" ".join(rnd.choice(WORDS) for _ in range(60)) for _ in range(40)]
+		(docDir / "readme.md").write_text(
+			"# Number Processing\n\n" + "\n\n".join(f"* {paragraph}" for paragraph in paragraphs),
+			encoding="utf-8",
+		)
+		jobs.append(
+			LocaleJob(
+				lang=lang,
+				po=str(localeDir / "LC_MESSAGES" / "nvda.po"),
+				mo=str(localeDir / "LC_MESSAGES" / "nvda.mo"),
+				manifestTemplate=str(template),
+				manifest=str(localeDir / "manifest.ini"),
+				docs=((str(docDir / "readme.md"), str(docDir / "readme.html")),),
+			),
+		)
+	return jobs
+
+
+def serialBuild(jobs: list[LocaleJob], settings: LocaleSettings):
+	"""The build before the locale stage: one language after another, the mo file read by each output."""
+	msgfmt = shutil.which("msgfmt")
+	for job in jobs:
+		if msgfmt:
+			subprocess.run([msgfmt, "-o", job.mo, job.po], check=True)
+		else:
+			with open(job.po, "rb") as f:
+				Path(job.mo).write_bytes(generateMo(parsePo(f.read())))
+		generateTranslatedManifest(
+			job.manifestTemplate,
+			job.manifest,
+			mo=job.mo,
+			addon_info=settings.addon_info,
+			brailleTables=settings.brailleTables,
+			symbolDictionaries=settings.symbolDictionaries,
+			speechDictionaries=settings.speechDictionaries,
+		)
+		for md, html in job.docs:
+			md2html(
+				md, html, moFile=job.mo, mdExtensions=settings.mdExtensions, addon_info=settings.addon_info
+			)
+
+
+def timeIt(function, *args, **kwargs) -> float:
+	start = time.perf_counter()
+	function(*args, **kwargs)
+	return time.perf_counter() - start
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark the locale build stage.")
+	parser.add_argument("--locales", type=int, default=60, help="synthetic languages")
+	parser.add_argument("--messages", type=int, default=500, help="messages per catalog")
+	parser.add_argument(
+		"--workers", type=int, default=None, help="processes of the stage, one per CPU if not given"
+	)
+	args = parser.parse_args()
+
+	settings = LocaleSettings(
+		addon_info=dict(buildVars.addon_info),
+		brailleTables=buildVars.brailleTables,
+		symbolDictionaries=buildVars.symbolDictionaries,
+		speechDictionaries=buildVars.speechDictionaries,
+		mdExtensions=buildVars.markdownExtensions,
+	)
+	workDir = Path(tempfile.mkdtemp(prefix="benchLocales"))
+	try:
+		jobs = generateLocales(workDir, args.locales, args.messages)
+		state = str(workDir / "state.json")
+		msgfmt = "msgfmt" if shutil.which("msgfmt") else "in-process, msgfmt not found"
+		print(f"{len(jobs)} languages, {args.messages} messages each, {os.cpu_count()} CPUs")
+		results = [
+			(f"serial ({msgfmt})", timeIt(serialBuild, jobs, settings)),
+			("stage, cold", timeIt(buildLocales, jobs, settings, state, args.workers)),
+			("stage, unchanged", timeIt(buildLocales, jobs, settings, state, args.workers)),
+		]
+		with open(jobs[0].po, "a", encoding="utf-8") as f:
+			f.write('\nmsgid "changed"\nmsgstr "cambiato"\n')
+		results.append(("stage, 1 changed", timeIt(buildLocales, jobs, settings, state, args.workers)))
+		baseline = results[0][1]
+		print(f"{'build':>32} {'seconds':>9} {'speedup':>8}")
+		for name, seconds in results:
+			print(f"{name:>32} {seconds:>9.3f} {baseline / seconds:>8.2f}")
+	finally:
+		shutil.rmtree(workDir)
+
+
+if __name__ == "__main__":
+	main()
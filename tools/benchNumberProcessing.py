@@ -0,0 +1,312 @@
+# Copyright Alberto Buffolino, released under GPL
+# Benchmark of the numberProcessing speech filter outside NVDA,
+# over generated corpora, output modes, number rules and several minimum number lengths,
+# and with growing lists of exceptions and currency symbols.
+# Usage:
+# python tools/benchNumberProcessing.py --save-baseline  (record results of this machine)
+# python tools/benchNumberProcessing.py  (compare with recorded results, failing on regressions)
+
+import argparse
+import json
+import random
+import sys
+import time
+import types
+from collections.abc import Callable
+from pathlib import Path
+
+import nvdaStandIns
+
+BASELINE_PATH = Path(__file__).with_name("benchBaseline.json")
+MIN_LENS = (2, 4, 8)
+# setting values of each benchmarked configuration; None stands for all number rules
+CONFIGURATIONS: dict[str, dict[str, object]] = {
+	"spacing": {"outputMode": "spacing", "enabledRules": []},
+	"characterMode": {"outputMode": "characterMode", "enabledRules": []},
+	"breaks": {"outputMode": "breaks", "enabledRules": []},
+	"allRules": {"outputMode": "spacing", "enabledRules": None},
+}
+CORPUS_SIZE = 2000
+EXCEPTION_COUNTS = (10, 100, 1000, 10000, 100000)
+CURRENCY_COUNTS = (10, 100, 300, 1000)
+
+
+def _webPrices(rnd: random.Random) -> str:
+	price = f"{rnd.randint(1, 9999):,}.{rnd.randint(0, 99):02d}"
+	symbol = rnd.choice("$£€¥₹")
+	return rnd.choice(
+		(
+			f"Price: {symbol}{price}, was {symbol} {price}0, save {rnd.randint(5, 70)}%",
+			f"Add to cart {symbol}{price} - free shipping on orders over {symbol}{rnd.randint(25, 99)}",
+			f"{rnd.randint(1, 5)} of 5 stars, {rnd.randint(10, 90000):,} reviews",
+			"Customers who bought this item also bought",
+		),
+	)
+
+
+def _spreadsheet(rnd: random.Random) -> str:
+	return rnd.choice(
+		(
+			f"{rnd.randint(100000, 99999999)}",
+			f"row {rnd.randint(1, 5000)} column {rnd.choice('ABCDEFGH')}",
+			f"{rnd.randint(1, 999)}.{rnd.randint(0, 99)}",
+			f"INV-{rnd.randint(2000, 2030)}-{rnd.randint(0, 999999):06d}",
+			f"{rnd.randint(2000, 2030)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+		),
+	)
+
+
+def _terminalLog(rnd: random.Random) -> str:
+	return (
+		f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} "
+		f"{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d},{rnd.randint(0, 999):03d} "
+		f"INFO [pid {rnd.randint(100, 65535)}] request {rnd.getrandbits(64):016x} "
+		f"completed in {rnd.randint(1, 5000)}ms, {rnd.randint(0, 10**9)} bytes"
+	)
+
+
+def _phoneList(rnd: random.Random) -> str:
+	name = rnd.choice(("Anna Rossi", "John Smith", "Li Wei", "Olga Petrenko"))
+	return rnd.choice(
+		(
+			f"{name} +{rnd.randint(1, 99)} {rnd.randint(100, 999)} {rnd.randint(100, 999)} {rnd.randint(1000, 9999)}",
+			f"{name}, ext. {rnd.randint(100, 9999)}",
+			f"{name} ({rnd.randint(100, 999)}) {rnd.randint(100, 999)}-{rnd.randint(1000, 9999)}",
+		),
+	)
+
+
+def _adversarial(rnd: random.Random) -> str:
+	size = rnd.randint(500, 5000)
+	return rnd.choice(
+		(
+			"9" * size,
+			"1," * size,
+			"$" * size + "1",
+			"$ " * size,
+			" " * size + "5",
+			"".join(rnd.choice("0123456789$., ") for _ in range(size)),
+			"x" * size,
+		),
+	)
+
+
+CORPORA: dict[str, Callable[[random.Random], str]] = {
+	"webPrices": _webPrices,
+	"spreadsheet": _spreadsheet,
+	"terminalLog": _terminalLog,
+	"phoneList": _phoneList,
+	"adversarial": _adversarial,
+}
+
+
+def generateCorpus(name: str, size: int = CORPUS_SIZE) -> list[str]:
+	"""
+	:param name: One of the CORPORA keys.
+	:param size: Number of speech items.
+	:return: Speech items, always the same for the same name and size.
+	"""
+	rnd = random.Random(name)
+	return [CORPORA[name](rnd) for _ in range(size // 10 if name == "adversarial" else size)]
+
+
+def generateExceptions(count: int) -> list[str]:
+	"""
+	:param count: Number of entries.
+	:return: Exception entries, mostly exact numbers, some with final "*" or "?" wildcards.
+	"""
+	rnd = random.Random(count)
+	entries: list[str] = []
+	for index in range(count):
+		number = str(rnd.randint(100, 99999999))
+		if index % 10 == 0:
+			entries.append(number[:3] + "*")
+		elif index % 10 == 1:
+			position = rnd.randrange(len(number))
+			entries.append(number[:position] + "?" + number[position + 1 :])
+		else:
+			entries.append(number)
+	return entries
+
+
+def generateCurrencies(count: int) -> list[str]:
+	"""
+	:param count: Number of symbols.
+	:return: Currency symbols, three letter codes and some shorter ones with a final "$".
+	"""
+	rnd = random.Random(count)
+	symbols: set[str] = {"USD", "EUR", "R$", "kr", "CHF"}
+	while len(symbols) < count:
+		code = "".join(rnd.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3))
+		symbols.add(code[:2] + "$" if rnd.random() < 0.1 else code)
+	return sorted(symbols)
+
+
+def measure(filterFunc: Callable[[list[str]], object], items: list[str], rounds: int) -> list[int]:
+	"""
+	:param filterFunc: The speech filter.
+	:param items: Speech items, each one passed as a one item sequence.
+	:param rounds: Number of passes over the items; the fastest one of each item is kept, to reduce noise.
+	:return: Per-item latencies in nanoseconds, in ascending order.
+	"""
+	latencies = [sys.maxsize] * len(items)
+	perfCounter = time.perf_counter_ns
+	for _ in range(rounds):
+		for index, item in enumerate(items):
+			sequence = [item]
+			start = perfCounter()
+			filterFunc(sequence)
+			latencies[index] = min(latencies[index], perfCounter() - start)
+	latencies.sort()
+	return latencies
+
+
+def calibrate() -> float:
+	"""
+	Times a fixed workload, so that results of runs at different machine speeds can be compared.
+
+	:return: Fastest time of the workload in microseconds.
+	"""
+	text = "order 12345678 paid $1,234.56 " * 20
+	best = sys.maxsize
+	for _ in range(20):
+		start = time.perf_counter_ns()
+		for _ in range(50):
+			"  ".join(text.split())
+			sorted(text)
+		best = min(best, time.perf_counter_ns() - start)
+	return best / 1000
+
+
+def measureOutput(filterFunc: Callable[[list[str]], list[object]], items: list[str]) -> tuple[float, float]:
+	"""
+	:param filterFunc: The speech filter.
+	:param items: Speech items, each one passed as a one item sequence.
+	:return: Output text length relative to input, and output sequence items (text and commands) per input item.
+	"""
+	inputChars = 0
+	outputChars = 0
+	outputItems = 0
+	for item in items:
+		sequence = filterFunc([item])
+		inputChars += len(item)
+		outputChars += sum(len(outputItem) for outputItem in sequence if isinstance(outputItem, str))
+		outputItems += len(sequence)
+	return outputChars / inputChars, outputItems / len(items)
+
+
+def measureResult(plugin: types.ModuleType, items: list[str], rounds: int) -> dict[str, float]:
+	"""
+	:param plugin: The plugin module, configured for the benchmark.
+	:param items: Speech items, each one passed as a one item sequence.
+	:param rounds: Number of passes over the items.
+	:return: Items per second, p50 and p99 latency in microseconds, and output size.
+	"""
+	latencies = measure(plugin.filter_numberProcessing, items, rounds)
+	outputChars, outputItems = measureOutput(plugin.filter_numberProcessing, items)
+	return {
+		"itemsPerSecond": len(latencies) / (sum(latencies) / 1e9),
+		"p50": latencies[len(latencies) // 2] / 1000,
+		"p99": latencies[int(len(latencies) * 0.99)] / 1000,
+		"outputChars": outputChars,
+		"outputItems": outputItems,
+	}
+
+
+def runBenchmarks(rounds: int) -> dict[str, dict[str, float]]:
+	"""
+	:param rounds: Number of passes over each corpus.
+	:return: Results by "configuration/corpus/minLen" key, with items per second, p50 and p99 latency
+		in microseconds, and output size.
+	"""
+	plugin = nvdaStandIns.loadPlugin()
+	from globalPlugins._numberTransform import NUMBER_RULES
+
+	# measure processing, not cache lookups
+	plugin.transformCache.maxEntries = 0
+	results: dict[str, dict[str, float]] = {"calibration": {"time": calibrate()}}
+	for configuration, values in CONFIGURATIONS.items():
+		if values["enabledRules"] is None:
+			values = dict(values, enabledRules=list(NUMBER_RULES))
+		for minLen in MIN_LENS:
+			nvdaStandIns.configure(plugin, userMinLen=minLen, **values)
+			for name in CORPORA:
+				items = generateCorpus(name)
+				results[f"{configuration}/{name}/{minLen}"] = measureResult(plugin, items, rounds)
+	# cost of exceptions check, with growing lists
+	nvdaStandIns.configure(plugin, userMinLen=2, **CONFIGURATIONS["spacing"])
+	items = generateCorpus("spreadsheet")
+	for count in EXCEPTION_COUNTS:
+		nvdaStandIns.configure(plugin, exceptions=generateExceptions(count))
+		results[f"exceptions/{count}"] = measureResult(plugin, items, rounds)
+	nvdaStandIns.configure(plugin, exceptions=[])
+	# cost of currency symbols matching, with growing tables
+	items = generateCorpus("webPrices")
+	for count in CURRENCY_COUNTS:
+		nvdaStandIns.configure(plugin, currencySymbols=generateCurrencies(count), normalizeAmounts=True)
+		results[f"currencies/{count}"] = measureResult(plugin, items, rounds)
+	nvdaStandIns.configure(plugin, currencySymbols=[], normalizeAmounts=False)
+	return results
+
+
+def findRegressions(
+	results: dict[str, dict[str, float]],
+	baseline: dict[str, dict[str, float]],
+	tolerance: float,
+) -> list[str]:
+	"""
+	:param results: Results of this run.
+	:param baseline: Recorded results.
+	:param tolerance: Allowed slowdown, as a fraction of baseline latency scaled to the machine speed.
+	:return: Descriptions of the latencies above tolerance.
+	"""
+	speedRatio = results["calibration"]["time"] / baseline["calibration"]["time"]
+	regressions: list[str] = []
+	for key, result in results.items():
+		if key == "calibration" or key not in baseline:
+			continue
+		for stat in ("p50", "p99"):
+			expected = baseline[key][stat] * speedRatio
+			if result[stat] > expected * (1 + tolerance):
+				regressions.append(f"{key} {stat}: {result[stat]:.2f}us, expected {expected:.2f}us")
+	return regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark the numberProcessing speech filter.")
+	parser.add_argument("--rounds", type=int, default=5, help="passes over each corpus")
+	parser.add_argument("--save-baseline", action="store_true", help="record results as baseline")
+	parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline file")
+	parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown over baseline")
+	args = parser.parse_args()
+
+	results = runBenchmarks(args.rounds)
+	print(
+		f"{'configuration/corpus/minLen':<32}{'items/s':>12}{'p50 us':>10}{'p99 us':>10}"
+		f"{'out chars':>11}{'out items':>11}",
+	)
+	for key, result in results.items():
+		if key == "calibration":
+			continue
+		print(
+			f"{key:<32}{result['itemsPerSecond']:>12.0f}{result['p50']:>10.2f}{result['p99']:>10.2f}"
+			f"{result['outputChars']:>11.2f}{result['outputItems']:>11.2f}",
+		)
+	if args.save_baseline:
+		args.baseline.write_text(json.dumps(results, indent="\t"), encoding="utf-8")
+		print(f"Baseline saved to {args.baseline}")
+		return
+	if not args.baseline.is_file():
+		print("No baseline to compare with, run with --save-baseline first.")
+		return
+	regressions = findRegressions(
+		results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance
+	)
+	for regression in regressions:
+		print(f"REGRESSION: {regression}")
+	if regressions:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,152 @@
+# Copyright Alberto Buffolino, released under GPL
+# Checks braille processing of the numberProcessing plugin outside NVDA, over the benchmark corpora:
+# digits of raw text and braille cells map to each other, cursor and selection follow their characters,
+# raw text is restored, no words or pauses meant for speech are shown, and text already brailled
+# is not processed again. Reports time per region of the braille stage, with text brailled before or not.
+# Usage: python tools/checkBrailleRegions.py [--min-len N] [--seed N]
+
+import argparse
+import random
+import sys
+import time
+
+import nvdaStandIns
+from benchNumberProcessing import CONFIGURATIONS, CORPORA, generateCorpus
+
+# settings, raw text and expected braille text
+EXAMPLES: tuple[tuple[dict[str, object], str, str], ...] = (
+	({"enabledRules": ["ip"]}, "IP 192.168.1.10", "IP 192.168.1.10"),
+	({"enabledRules": ["card"]}, "card 4111 1111 1111 1111", "card 4 1 1 1  1 1 1 1  1 1 1 1  1 1 1 1"),
+	({"enabledRules": ["phone"]}, "call +39 333 1234567", "call +3 9  3 3 3  1 2 3 4 5 6 7"),
+	({"currencySymbols": ["USD"]}, "or USD 30", "or 3 0 USD"),
+	({"groupingMode": "pattern"}, "Account 12345678 owes $15", "Account 1234 5678 owes 15$"),
+	({"outputMode": "characterMode", "groupingMode": "pairs"}, "PIN 1234", "PIN 1 2 3 4"),
+)
+
+
+def checkRegion(text: str, rnd: random.Random) -> list[str]:
+	"""
+	Updates a stand-in region of the text, with cursor, selection and typeforms at random positions.
+
+	:return: Failures found.
+	"""
+	region = sys.modules["braille"].Region()
+	region.rawText = text
+	region.rawTextTypeforms = [index % 3 for index in range(len(text))]
+	region.cursorPos = cursorPos = rnd.randint(0, len(text))
+	selectionStart = rnd.randint(0, len(text))
+	region.selectionStart, region.selectionEnd = selectionStart, rnd.randint(selectionStart, len(text))
+	region.update()
+	failures: list[str] = []
+	if region.rawText != text or region.cursorPos != cursorPos:
+		failures.append("raw text or cursor not restored")
+	cells = region.brailleCells
+	if len(region.rawToBraillePos) != len(text) or len(region.brailleToRawPos) != len(cells):
+		failures.append("position maps of wrong length")
+		return failures
+	if region.rawToBraillePos != sorted(region.rawToBraillePos):
+		failures.append("raw positions out of order")
+	for pos, char in enumerate(text):
+		if char.isdigit() and cells[region.rawToBraillePos[pos]] != char:
+			failures.append(f"digit at {pos} mapped to {cells[region.rawToBraillePos[pos]]!r}")
+			break
+	for pos, cell in enumerate(cells):
+		if cell.isdigit() and text[region.brailleToRawPos[pos]] != cell:
+			failures.append(f"cell {pos} routed to {text[region.brailleToRawPos[pos]]!r}")
+			break
+	if [char for char in text if char.isdigit()] != [cell for cell in cells if cell.isdigit()]:
+		failures.append("digits changed")
+	if sorted(char for char in text if char.isalpha()) != sorted(cell for cell in cells if cell.isalpha()):
+		failures.append("words added or removed")
+	if cells.count(",") > text.count(","):
+		failures.append("pauses added")
+	if cursorPos < len(text) and region.brailleCursorPos != region.rawToBraillePos[cursorPos]:
+		failures.append("cursor not on its character")
+	if selectionStart < len(text) and region.brailleSelectionStart != region.rawToBraillePos[selectionStart]:
+		failures.append("selection not on its characters")
+	return failures
+
+
+def timeRegions(texts: list[str], cached: bool) -> tuple[float, int]:
+	"""
+	Updates a region of each text, after updating it once before if cached is set,
+	as when the same line is shown again.
+
+	:return: Microseconds per region update, and cached texts processed again.
+	"""
+	Region = sys.modules["braille"].Region
+	transformCache = sys.modules["globalPlugins.numberProcessing"].transformCache
+	elapsed = 0
+	processedAgain = 0
+	for text in texts:
+		region = Region()
+		region.rawText = text
+		if cached:
+			region.update()
+		misses = transformCache.misses
+		start = time.perf_counter_ns()
+		region.update()
+		elapsed += time.perf_counter_ns() - start
+		processedAgain += cached and transformCache.misses != misses
+	return elapsed / len(texts) / 1000, processedAgain
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Check braille processing of the numberProcessing plugin.")
+	parser.add_argument("--min-len", type=int, default=2, help="minimum number of digits to process")
+	parser.add_argument("--seed", type=int, default=1)
+	args = parser.parse_args()
+
+	plugin = nvdaStandIns.loadPlugin(args.min_len)
+	from globalPlugins._numberTransform import NUMBER_RULES, metrics
+
+	rnd = random.Random(args.seed)
+	failures: list[str] = []
+	defaults = dict(CONFIGURATIONS["spacing"], braille=True, groupingMode="singles", currencySymbols=[])
+	for values, text, expected in EXAMPLES:
+		nvdaStandIns.configure(plugin, **dict(defaults, **values))
+		region = sys.modules["braille"].Region()
+		region.rawText = text
+		region.update()
+		if "".join(region.brailleCells) != expected:
+			failures.append(f"{text!r} shown as {''.join(region.brailleCells)!r}, expected {expected!r}")
+	nvdaStandIns.configure(plugin, **defaults)
+	print(
+		f"{'configuration':>14} {'corpus':>12} {'regions':>8} {'rewritten':>9} {'cold us':>8} {'cached us':>9}"
+	)
+	for configName, values in CONFIGURATIONS.items():
+		values = dict(values)
+		if values["enabledRules"] is None:
+			values["enabledRules"] = list(NUMBER_RULES)
+		for corpusName in CORPORA:
+			corpus = generateCorpus(corpusName)
+			nvdaStandIns.configure(plugin, braille=True, **values)
+			metrics.reset()
+			for text in corpus:
+				for failure in checkRegion(text, rnd):
+					failures.append(f"{configName}, {corpusName}, {text[:40]!r}: {failure}")
+			regions, rewritten = metrics.brailleRegions, metrics.rewrittenRegions
+			plugin.transformCache.clear()
+			coldTime, _processedAgain = timeRegions(corpus, False)
+			plugin.transformCache.clear()
+			cachedTime, processedAgain = timeRegions(corpus, True)
+			if processedAgain:
+				failures.append(
+					f"{configName}, {corpusName}: {processedAgain} brailled texts processed again"
+				)
+			print(
+				f"{configName:>14} {corpusName:>12} {regions:>8} {rewritten:>9} "
+				f"{coldTime:>8.1f} {cachedTime:>9.1f}",
+			)
+	# disabled braille processing leaves regions to NVDA
+	nvdaStandIns.configure(plugin, braille=False)
+	if sys.modules["braille"].Region.update is plugin.update_numberProcessing:
+		failures.append("braille processing still registered when disabled")
+	for failure in failures[:20]:
+		print(f"FAILURE: {failure}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
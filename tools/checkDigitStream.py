@@ -0,0 +1,55 @@
+# Copyright Alberto Buffolino, released under GPL
+# Checks streaming of the numberProcessing speech filter outside NVDA: long digit runs split across
+# adjacent items, or across sequences, are spelled as a single run; labels ending with a short number,
+# like "column 2" or "Page 1" before the text they announce, and items separated by a command, are spoken
+# exactly as without streaming.
+# Usage: python tools/checkDigitStream.py
+
+import sys
+
+import nvdaStandIns
+
+# minimum number of digits, sequences spoken one after another, and expected output of the last one;
+# None if it must be the same as without streaming
+CASES: tuple[tuple[str, int, tuple[list[object], ...], list[object] | None], ...] = (
+	("ID split in items", 2, (["ID 123456", "789012"],), ["ID 1  2  3  4  5  6  7  8  9  0  1  2"]),
+	("ID split in sequences", 12, (["ID 1234567890"], ["12 end"]), ["1  2 end"]),
+	("table cell after labels", 2, (["row 3", "column 2", "45"],), None),
+	("results after page", 3, (["Page 1"], ["23 results"]), None),
+	("list items after level", 2, (["level 2", "10 items"],), None),
+	("short run in items", 2, (["ID 1234", "567"],), None),
+	("command between items", 2, (["ID 123456", "command", "789012"],), None),
+)
+
+
+def speak(plugin, sequences: tuple[list[object], ...], command: object) -> list[object]:
+	"""
+	:return: Output of the speech filter for the last sequence, after the others.
+	"""
+	plugin.digitStream.reset()
+	output: list[object] = []
+	for sequence in sequences:
+		output = plugin.filter_numberProcessing([command if item == "command" else item for item in sequence])
+	return [item for item in output if item is not command]
+
+
+def main():
+	plugin = nvdaStandIns.loadPlugin()
+	command = sys.modules["speech.commands"].IndexCommand()
+	failures: list[str] = []
+	for name, minLen, sequences, expected in CASES:
+		nvdaStandIns.configure(plugin, userMinLen=minLen, streaming=False)
+		unjoined = speak(plugin, sequences, command)
+		nvdaStandIns.configure(plugin, streaming=True)
+		output = speak(plugin, sequences, command)
+		print(f"{name:>24}: {output!r}")
+		if output != (unjoined if expected is None else expected):
+			failures.append(f"{name}: {output!r}, expected {expected or unjoined!r}")
+	for failure in failures:
+		print(f"FAILURE: {failure}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
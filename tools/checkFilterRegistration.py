@@ -0,0 +1,71 @@
+# Copyright Alberto Buffolino, released under GPL
+# Checks that the speech filter of the numberProcessing plugin is registered only while processing is enabled:
+# sequences are spoken through the stand-in filter_speechSequence across enabling, disabling,
+# profile switches and terminate, counting calls of the filter, which must be none while disabled.
+# Usage: python tools/checkFilterRegistration.py [--sequences N]
+
+import argparse
+import sys
+
+import nvdaStandIns
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Check registration of the numberProcessing speech filter.")
+	parser.add_argument("--sequences", type=int, default=100, help="sequences spoken at each step")
+	args = parser.parse_args()
+
+	plugin = nvdaStandIns.loadPlugin()
+	config = sys.modules["config"]
+	filterSpeechSequence = sys.modules["speech"].extensions.filter_speechSequence
+	# counted from now on, registered by the plugin under its module name
+	plugin.disableProcessing()
+	calls = 0
+	originalFilter = plugin.filter_numberProcessing
+
+	def countingFilter(speechSequence):
+		nonlocal calls
+		calls += 1
+		return originalFilter(speechSequence)
+
+	plugin.filter_numberProcessing = countingFilter
+	globalPlugin = plugin.GlobalPlugin()
+
+	def switchProfile(name: str | None, autoEnable: bool = False):
+		config.conf.profiles[-1] = type(config.conf.profiles[-1])(name)
+		config.conf["numberProcessing"]["autoEnable"] = autoEnable
+		config.post_configProfileSwitch.notify()
+
+	# step, and whether the filter must be called
+	steps = (
+		("started", lambda: None, False),
+		("enabled", plugin.enableProcessing, True),
+		("disabled", plugin.disableProcessing, False),
+		("switched to a disabled profile", lambda: switchProfile("reading"), False),
+		("enabled in that profile", plugin.enableProcessing, True),
+		("switched back", lambda: switchProfile(None), False),
+		("switched to an auto enabled profile", lambda: switchProfile("terminal", True), True),
+		("auto enable turned off", lambda: switchProfile("terminal"), False),
+		("enabled again", plugin.enableProcessing, True),
+		("terminated", globalPlugin.terminate, False),
+	)
+	failures: list[str] = []
+	print(f"{'step':>36} {'calls':>6}")
+	for name, action, enabled in steps:
+		action()
+		calls = 0
+		for index in range(args.sequences):
+			filterSpeechSequence.apply(["item %d, order 12345678" % index])
+		print(f"{name:>36} {calls:>6}")
+		if calls != (args.sequences if enabled else 0):
+			failures.append(f"{name}: filter called {calls} times")
+	if filterSpeechSequence.handlers:
+		failures.append("handlers left registered after terminate")
+	for failure in failures:
+		print(f"FAILURE: {failure}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,126 @@
+# Copyright Alberto Buffolino, released under GPL
+# Checks the cost of importing the numberProcessing plugin at NVDA startup, under the stand-ins:
+# import time within budget, no settings GUI or offline tools imported, no pattern compiled.
+# Stand-ins of modules needed only by the settings panel, braille, focus or prefetch are left uninstalled,
+# so that the import fails if the plugin imports them. Bytecode is cached, as NVDA does,
+# in a temporary directory instead of the add-on tree.
+# Usage: python tools/checkImportTime.py [--budget MS] [--runs N]
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# modules never needed while the plugin is imported
+FORBIDDEN_MODULES = (
+	"globalPlugins.numberProcessing.settingsUI",
+	"gui",
+	"wx",
+	"queue",
+	"globalPlugins._numberTransform.batch",
+	"globalPlugins._numberTransform.__main__",
+	"argparse",
+	"concurrent.futures",
+	"mmap",
+	"multiprocessing",
+)
+# stand-ins removed before the import
+LAZY_MODULES = (
+	"api",
+	"braille",
+	"browseMode",
+	"gui",
+	"gui.guiHelper",
+	"gui.nvdaControls",
+	"gui.settingsDialogs",
+	"textInfos",
+	"wx",
+)
+
+
+def measureImport(pycachePrefix: str) -> dict[str, object]:
+	"""
+	Imports the plugin in this process, that must not have imported it yet.
+
+	:param pycachePrefix: Directory of bytecode caches, shared by all runs.
+
+	:return: Import time in milliseconds, modules imported by the plugin, and whether its scanner was compiled;
+		or the error of the import.
+	"""
+	import nvdaStandIns
+
+	# written out of the add-on tree, so allowed again after the stand-ins turned it off
+	sys.pycache_prefix = pycachePrefix
+	sys.dont_write_bytecode = False
+	nvdaStandIns.install()
+	for name in LAZY_MODULES:
+		del sys.modules[name]
+	sys.path.insert(0, str(nvdaStandIns.PLUGINS_DIR.parent))
+	before = set(sys.modules)
+	start = time.perf_counter_ns()
+	try:
+		from globalPlugins import numberProcessing
+	except ImportError as e:
+		return {"error": repr(e)}
+
+	elapsed = (time.perf_counter_ns() - start) / 1e6
+	return {
+		"time": elapsed,
+		"modules": sorted(set(sys.modules) - before),
+		"compiled": numberProcessing.activeRules._scanner is not None,
+	}
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Check import cost of the numberProcessing plugin.")
+	parser.add_argument("--budget", type=float, default=10.0, help="maximum import time in milliseconds")
+	parser.add_argument(
+		"--runs", type=int, default=5, help="fresh interpreters to import in; the fastest counts"
+	)
+	parser.add_argument("--child", metavar="PYCACHE_PREFIX", help=argparse.SUPPRESS)
+	args = parser.parse_args()
+
+	if args.child:
+		print(json.dumps(measureImport(args.child)))
+		return
+	# the first run compiles the plugin, the others import its cached bytecode
+	with tempfile.TemporaryDirectory(prefix="checkImportTime") as pycachePrefix:
+		results = [
+			json.loads(
+				subprocess.run(
+					[sys.executable, str(Path(__file__).resolve()), "--child", pycachePrefix],
+					capture_output=True,
+					check=True,
+					text=True,
+				).stdout,
+			)
+			for _ in range(args.runs)
+		]
+	if "error" in results[0]:
+		print(f"FAILURE: plugin import needs a module imported later: {results[0]['error']}")
+		sys.exit(1)
+	best = min(result["time"] for result in results)
+	modules = results[0]["modules"]
+	print(f"import time: {best:.2f}ms (budget {args.budget:.2f}ms)")
+	print(f"{len(modules)} modules imported: {', '.join(modules)}")
+	failures: list[str] = []
+	if best > args.budget:
+		failures.append(f"import time {best:.2f}ms over budget")
+	failures.extend(
+		f"{module} imported at startup"
+		for module in modules
+		if any(module == name or module.startswith(name + ".") for name in FORBIDDEN_MODULES)
+	)
+	if results[0]["compiled"]:
+		failures.append("scanner compiled at startup")
+	for failure in failures:
+		print(f"FAILURE: {failure}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,115 @@
+# Copyright Alberto Buffolino, released under GPL
+# Checks that processing time grows linearly with the length of adversarial texts, like long runs of digits,
+# separators, currency symbols and whitespace, or words and numbers without punctuation;
+# that processing in chunks gives the same output as a single pass; and that, with a time budget,
+# it stops within the budget plus the time of a chunk. Texts without any point where they can be split,
+# like a single huge number or a run of currency symbols, are bounded by the maximum item length instead.
+# Usage: python tools/checkLinearTime.py [--max-length N] [--budget MS]
+
+import argparse
+import random
+import sys
+import time
+from collections.abc import Callable
+
+from nvdaStandIns import PLUGINS_DIR
+
+sys.path.insert(0, str(PLUGINS_DIR))
+from _numberTransform import CHUNK_LENGTH, CURRENCY_SYMBOLS, NUMBER_RULES, NumberScanner  # noqa: E402
+
+
+def randomText(rnd: random.Random, length: int) -> str:
+	return "".join(rnd.choice("0123456789$., \nab") for _ in range(length))
+
+
+# adversarial texts of about the given length
+TEXTS: dict[str, Callable[[int], str]] = {
+	"digits": lambda length: "9" * length,
+	"separators": lambda length: "1," * (length // 2),
+	"symbols": lambda length: "$" * length + "1",
+	"spacedSymbols": lambda length: "$ " * (length // 2),
+	"spaces": lambda length: " " * length + "5",
+	"spacedDigits": lambda length: "1 2 " * (length // 4),
+	"words": lambda length: "ab 12 cd 3456 " * (length // 14),
+	"capitals": lambda length: "GB AB " * (length // 6),
+	"ibans": lambda length: "GB82 WEST 1234 5698 7654 32 " * (length // 28),
+	"mixed": lambda length: randomText(random.Random(length), length),
+}
+# texts with split points, whose chunked processing must stop within budget
+BUDGET_TEXTS = ("spacedDigits", "spacedSymbols", "words", "capitals", "ibans", "mixed")
+# time per character at the longest length, relative to the shortest one
+MAX_GROWTH = 3.0
+# slack over the budget, for timer resolution and a machine busy with other work
+BUDGET_SLACK_MS = 15
+
+
+def timeProcess(scanner: NumberScanner, text: str, runs: int = 3) -> float:
+	"""
+	:return: Fastest time of a single pass over text, in seconds.
+	"""
+	best = float("inf")
+	for _ in range(runs):
+		start = time.perf_counter()
+		scanner.process(text)
+		best = min(best, time.perf_counter() - start)
+	return best
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Check linear processing time on adversarial texts.")
+	parser.add_argument("--max-length", type=int, default=100000, help="longest text, in characters")
+	parser.add_argument("--budget", type=int, default=50, help="time budget of chunked processing, in ms")
+	args = parser.parse_args()
+
+	lengths = [args.max_length // 8, args.max_length // 4, args.max_length // 2, args.max_length]
+	scanners = {
+		"noRules": NumberScanner(CURRENCY_SYMBOLS, 2),
+		"allRules": NumberScanner(
+			CURRENCY_SYMBOLS,
+			2,
+			enabledRules=tuple(NUMBER_RULES),
+			currencies=("USD", "kr"),
+			normalizeAmounts=True,
+		),
+	}
+	failures: list[str] = []
+	print(
+		f"{'scanner':>8} {'text':>13} " + " ".join(f"{length:>8}" for length in lengths) + "  ns/char growth"
+	)
+	for scannerName, scanner in scanners.items():
+		for textName, makeText in TEXTS.items():
+			texts = [makeText(length) for length in lengths]
+			perChar = [timeProcess(scanner, text) / len(text) * 1e9 for text in texts]
+			growth = perChar[-1] / perChar[0]
+			print(
+				f"{scannerName:>8} {textName:>13} "
+				+ " ".join(f"{value:>8.1f}" for value in perChar)
+				+ f"  {growth:>6.2f}",
+			)
+			if growth > MAX_GROWTH:
+				failures.append(f"{scannerName}, {textName}: time per character grew {growth:.1f} times")
+			text = texts[-1]
+			output, completed = scanner.processChunks(text, time.perf_counter_ns() + 10**12)
+			if not completed or output != scanner.process(text):
+				failures.append(f"{scannerName}, {textName}: chunked output differs from a single pass")
+			if textName not in BUDGET_TEXTS:
+				continue
+			# stops within budget, plus the time of one chunk
+			start = time.perf_counter_ns()
+			output, completed = scanner.processChunks(text, start + args.budget * 1000000)
+			elapsed = (time.perf_counter_ns() - start) / 1e6
+			chunkTime = timeProcess(scanner, text[: 2 * CHUNK_LENGTH], 1) * 1000
+			if elapsed > args.budget + chunkTime + BUDGET_SLACK_MS:
+				failures.append(f"{scannerName}, {textName}: {elapsed:.0f}ms with a {args.budget}ms budget")
+			# with a deadline already passed, it stops after the first chunk, far from the end of text
+			output, completed = scanner.processChunks(text, 0)
+			if completed or not text.endswith(output[-CHUNK_LENGTH:]):
+				failures.append(f"{scannerName}, {textName}: rest of text not left unchanged")
+	for failure in failures:
+		print(f"FAILURE: {failure}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,73 @@
+# Copyright Alberto Buffolino, released under GPL
+# Checks the parallel locale build stage under the spawn start method, the default on Windows,
+# where worker processes import the build tools again: the tools directory is taken off sys.path
+# before building, as SCons does once the tool is loaded, and several workers are forced
+# even on a machine with a single CPU. Outputs must equal those of a build in this process.
+# Needs the build requirements (SCons, Markdown).
+# Usage: python tools/checkLocalesSpawn.py [--locales N] [--workers N]
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SITE_TOOLS = str(ROOT / "site_scons" / "site_tools")
+
+
+def readOutputs(jobs) -> dict[str, bytes]:
+	paths = [path for job in jobs for path in (job.mo, job.manifest, *(html for _md, html in job.docs))]
+	return {path: Path(path).read_bytes() for path in paths}
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Check the locale build stage under the spawn start method.")
+	parser.add_argument("--locales", type=int, default=8, help="synthetic languages")
+	parser.add_argument("--workers", type=int, default=4, help="processes of the stage")
+	args = parser.parse_args()
+
+	multiprocessing.set_start_method("spawn", force=True)
+	# imported here, so that spawned processes, running this module again, don't find the tools
+	sys.dont_write_bytecode = True
+	sys.path.insert(0, str(ROOT / "tools"))
+	sys.path.insert(0, SITE_TOOLS)
+	from benchLocales import generateLocales
+	from NVDATool.locales import LocaleSettings, buildLocales
+
+	import buildVars
+
+	# also added by benchLocales
+	sys.path[:] = [path for path in sys.path if path != SITE_TOOLS]
+	settings = LocaleSettings(
+		addon_info=dict(buildVars.addon_info),
+		brailleTables=buildVars.brailleTables,
+		symbolDictionaries=buildVars.symbolDictionaries,
+		speechDictionaries=buildVars.speechDictionaries,
+		mdExtensions=buildVars.markdownExtensions,
+	)
+	failures: list[str] = []
+	with tempfile.TemporaryDirectory(prefix="checkLocalesSpawn") as workDir:
+		jobs = generateLocales(Path(workDir), args.locales, 50)
+		buildLocales(jobs, settings, str(Path(workDir) / "serial.json"), workers=1)
+		expected = readOutputs(jobs)
+		for path in expected:
+			Path(path).unlink()
+		try:
+			built = buildLocales(jobs, settings, str(Path(workDir) / "spawn.json"), workers=args.workers)
+		except Exception as e:
+			failures.append(f"build with {args.workers} spawned workers failed: {e!r}")
+		else:
+			print(f"{len(built)} languages built by {args.workers} spawned workers")
+			if sorted(built) != sorted(job.lang for job in jobs):
+				failures.append(f"built {built}")
+			if readOutputs(jobs) != expected:
+				failures.append("outputs differ from those built in this process")
+	for failure in failures:
+		print(f"FAILURE: {failure}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,75 @@
+# Copyright Alberto Buffolino, released under GPL
+# Checks, with tracemalloc, the path of the numberProcessing speech filter for sequences without numbers:
+# the sequence itself is returned, with the same items, and no memory is kept for it.
+# The path is not free of allocations, since timestamps and the metrics counters are int objects;
+# so the check bounds memory kept after all calls, which must not grow with their number,
+# and the peak of memory during them, to MAX_BYTES each.
+# Usage: python tools/checkNoMatchAllocations.py [--calls N]
+
+import argparse
+import sys
+import tracemalloc
+from collections.abc import Callable
+
+import nvdaStandIns
+from benchNumberProcessing import CONFIGURATIONS
+
+# sequences without numbers, with commands among strings
+SEQUENCES = (
+	["Hello world, nothing to process here", "second item"],
+	["Heading level two", None, "Link, visited"],
+	["", "a"],
+)
+# memory kept after calls, and peak of memory during them, in bytes;
+# ints of timestamps and counters, whatever the number of calls
+MAX_BYTES = 1024
+
+
+def measureCalls(filterFunc: Callable[[list[object]], list[object]], calls: int) -> tuple[int, int]:
+	"""
+	:return: Memory kept after the calls, and peak of memory during them, in bytes.
+	"""
+	tracemalloc.start()
+	try:
+		start = tracemalloc.get_traced_memory()[0]
+		for _ in range(calls):
+			for sequence in SEQUENCES:
+				filterFunc(sequence)
+		kept, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+	return kept - start, peak - start
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Check allocations of the no-match speech filter path.")
+	parser.add_argument("--calls", type=int, default=10000, help="calls of the filter per sequence")
+	args = parser.parse_args()
+
+	plugin = nvdaStandIns.loadPlugin()
+	from globalPlugins._numberTransform import NUMBER_RULES
+
+	failures: list[str] = []
+	print(f"{'configuration':>14} {'calls':>8} {'kept B':>7} {'peak B':>7}")
+	for configName, values in CONFIGURATIONS.items():
+		values = dict(values)
+		if values["enabledRules"] is None:
+			values["enabledRules"] = list(NUMBER_RULES)
+		nvdaStandIns.configure(plugin, **values)
+		for sequence in SEQUENCES:
+			output = plugin.filter_numberProcessing(sequence)
+			if output is not sequence or any(a is not b for a, b in zip(output, sequence)):
+				failures.append(f"{configName}: {sequence!r} not returned as it is")
+		for calls in (args.calls // 10, args.calls):
+			kept, peak = measureCalls(plugin.filter_numberProcessing, calls)
+			print(f"{configName:>14} {calls:>8} {kept:>7} {peak:>7}")
+			if kept > MAX_BYTES or peak > MAX_BYTES:
+				failures.append(f"{configName}: {kept} bytes kept, {peak} at peak, over {calls} calls")
+	for failure in failures:
+		print(f"FAILURE: {failure}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
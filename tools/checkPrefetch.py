@@ -0,0 +1,174 @@
+# Copyright Alberto Buffolino, released under GPL
+# Checks background prefetch of the numberProcessing plugin outside NVDA, against a fake browse mode document:
+# upcoming text is fetched in slices, one per main loop step, up to the prefetch bound;
+# results reach the transform cache equal to the speech filter ones, within the memory cap,
+# without counting in metrics; and focus leaving the document stops both fetching and the worker.
+# Usage: python tools/checkPrefetch.py [--lines N]
+
+import argparse
+import sys
+import threading
+import time
+import types
+
+import nvdaStandIns
+
+# seconds to wait for the worker thread
+WORKER_TIMEOUT = 10
+
+
+class FakeTextInfo:
+	"""Stand-in for a TextInfo of a document, a range of its text."""
+
+	def __init__(self, document: "FakeDocument", start: int):
+		self.document = document
+		self.start = self.end = start
+
+	def move(self, unit: str, count: int, endPoint: str) -> int:
+		end = min(self.end + count, len(self.document.text))
+		moved, self.end = end - self.end, end
+		return moved
+
+	@property
+	def text(self) -> str:
+		text = self.document.text[self.start : self.end]
+		self.document.reads.append(len(text))
+		return text
+
+	def collapse(self, end: bool = False):
+		if end:
+			self.start = self.end
+		else:
+			self.end = self.start
+
+
+class FakeDocument:
+	"""Stand-in for a browse mode document, recording the length of each text read."""
+
+	def __init__(self, text: str):
+		self.text = text
+		self.isReady = True
+		self.reads: list[int] = []
+
+	def makeTextInfo(self, position: str) -> FakeTextInfo:
+		return FakeTextInfo(self, 0)
+
+
+class MainLoop:
+	"""Stand-in for wx.CallAfter, running queued calls one step at a time."""
+
+	def __init__(self):
+		self.calls: list[tuple[object, tuple[object, ...]]] = []
+
+	def callAfter(self, func, *args: object):
+		self.calls.append((func, args))
+
+	def step(self) -> bool:
+		if not self.calls:
+			return False
+		func, args = self.calls.pop(0)
+		func(*args)
+		return True
+
+
+def waitWorker() -> bool:
+	"""
+	:return: Whether no prefetch worker is left running.
+	"""
+	for thread in threading.enumerate():
+		if thread.name == "numberProcessingPrefetcher":
+			thread.join(WORKER_TIMEOUT)
+			if thread.is_alive():
+				return False
+	return True
+
+
+def focus(globalPlugin, obj: object):
+	globalPlugin.event_gainFocus(types.SimpleNamespace(treeInterceptor=obj), lambda: None)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Check background prefetch of the numberProcessing plugin.")
+	parser.add_argument("--lines", type=int, default=20000, help="lines of the fake document")
+	args = parser.parse_args()
+
+	plugin = nvdaStandIns.loadPlugin()
+	nvdaStandIns.configure(plugin, prefetch=True)
+	from globalPlugins._numberTransform import metrics
+
+	mainLoop = MainLoop()
+	sys.modules["wx"].CallAfter = mainLoop.callAfter
+	documentClass = sys.modules["browseMode"].BrowseModeDocumentTreeInterceptor
+	globalPlugin = plugin.GlobalPlugin()
+	prefetcher = plugin.prefetcher
+	failures: list[str] = []
+	lines = [f"Order {index:08d}, paid ${index * 7 % 10000}.{index % 100:02d}" for index in range(args.lines)]
+	text = "\n".join(lines)
+
+	# a whole bounded prefetch
+	document = type("Document", (FakeDocument, documentClass), {})(text)
+	metrics.reset()
+	focus(globalPlugin, document)
+	steps = 0
+	longestStep = 0.0
+	while True:
+		start = time.perf_counter()
+		if not mainLoop.step():
+			break
+		longestStep = max(longestStep, time.perf_counter() - start)
+		steps += 1
+	if not waitWorker():
+		failures.append("worker still running after the last slice")
+	fetched = sum(document.reads)
+	print(
+		f"whole prefetch: {steps} steps, {len(document.reads)} slices, {fetched} chars fetched, "
+		f"longest step {longestStep * 1000:.2f}ms, {len(prefetcher.results)} results",
+	)
+	if max(document.reads) > plugin.PREFETCH_SLICE_CHARS:
+		failures.append(f"slice of {max(document.reads)} chars fetched at once")
+	if fetched > plugin.PREFETCH_MAX_CHARS + plugin.PREFETCH_SLICE_CHARS:
+		failures.append(f"{fetched} chars fetched, over the prefetch bound")
+	# memory cap
+	results = list(prefetcher.results)
+	if not results or len(results) > prefetcher.maxItems:
+		failures.append(f"{len(results)} results, with a cap of {prefetcher.maxItems}")
+	if sum(len(text) for _rules, text, _result in results) > prefetcher.maxChars:
+		failures.append("results over the characters cap")
+	if metrics.expandedDigits:
+		failures.append(f"{metrics.expandedDigits} digits of background processing counted in metrics")
+	for rules, line, result in results:
+		if line not in lines or result != rules.scanner.process(line):
+			failures.append(f"{line!r} prefetched as {result!r}")
+			break
+	# results reach the cache, then speech finds them there
+	misses = plugin.transformCache.misses
+	for _rules, line, _result in results:
+		plugin.filter_numberProcessing([line])
+	if plugin.transformCache.misses != misses:
+		failures.append(f"{plugin.transformCache.misses - misses} prefetched lines processed again")
+
+	# cancellation, when focus leaves the document after a few slices
+	document = type("Document", (FakeDocument, documentClass), {})(text)
+	focus(globalPlugin, None)
+	focus(globalPlugin, document)
+	for _ in range(3):
+		mainLoop.step()
+	slices = len(document.reads)
+	focus(globalPlugin, None)
+	while mainLoop.step():
+		pass
+	if not waitWorker():
+		failures.append("worker still running after cancel")
+	print(f"cancelled prefetch: {slices} slices before cancel, {len(document.reads)} after")
+	if len(document.reads) != slices:
+		failures.append(f"{len(document.reads) - slices} slices fetched after cancel")
+	if prefetcher.results:
+		failures.append(f"{len(prefetcher.results)} results left after cancel")
+	for failure in failures:
+		print(f"FAILURE: {failure}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,107 @@
+# Copyright Alberto Buffolino, released under GPL
+# Checks the number scanner against the reference pipeline it replaced, which moved currency symbols
+# and then spelled digit runs in two regular expression passes: output of the scanner, with no number rules
+# and in spacing mode, must be identical on a fuzz corpus of digits, separators, currency symbols
+# and whitespace, and on the benchmark corpora. Reports the fastest time per item of both, and the scanner
+# must not be slower than the reference on any corpus, by the median speedup of rounds timing both.
+# Usage: python tools/checkReferencePipeline.py [--items N] [--seed N]
+
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+from collections.abc import Callable
+
+from benchNumberProcessing import CORPORA, MIN_LENS, generateCorpus
+from nvdaStandIns import PLUGINS_DIR
+
+sys.path.insert(0, str(PLUGINS_DIR))
+from _numberTransform import CURRENCY_SYMBOLS, NumberScanner  # noqa: E402
+
+FUZZ_ALPHABET = "0123456789" * 3 + ",.,. \t\n$£¥€₹💵a"
+
+
+class ReferencePipeline:
+	"""The speech filter before the number scanner: a digit pre-screen, a currency symbol pass
+	and a digit pass with a Python callback."""
+
+	condExp = re.compile(r"\d")
+	symbolExp = re.compile(r"([%s])?(\s*)?(\d+([,.]\d+)*)" % "".join(CURRENCY_SYMBOLS))
+
+	def __init__(self, userMinLen: int):
+		self.digitExp = re.compile(r"\d{%s,}" % userMinLen)
+
+	@staticmethod
+	def replaceFunc(match: re.Match[str]) -> str:
+		return "  ".join(list(match.group(0)))
+
+	def process(self, item: str) -> str:
+		if not self.condExp.search(item):
+			return item
+		item = self.symbolExp.sub(r"\2\3\1", item)
+		return self.digitExp.sub(self.replaceFunc, item)
+
+
+def generateFuzzCorpus(count: int, rnd: random.Random) -> list[str]:
+	return ["".join(rnd.choices(FUZZ_ALPHABET, k=rnd.randint(1, 40))) for _ in range(count)]
+
+
+def timeItems(
+	processes: tuple[Callable[[str], str], ...], items: list[str], rounds: int = 9
+) -> list[list[float]]:
+	"""
+	Passes of the processes alternate, so that those of a round see the same load of the machine.
+	:return: Time of each pass over items, by process, in microseconds per item.
+	"""
+	times: list[list[float]] = [[] for _ in processes]
+	for _ in range(rounds):
+		for passTimes, process in zip(times, processes):
+			start = time.perf_counter_ns()
+			for item in items:
+				process(item)
+			passTimes.append((time.perf_counter_ns() - start) / len(items) / 1000)
+	return times
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Check the number scanner against the reference pipeline.")
+	parser.add_argument("--items", type=int, default=100000, help="strings of the fuzz corpus")
+	parser.add_argument("--seed", type=int, default=1)
+	args = parser.parse_args()
+
+	corpora = {"fuzz": generateFuzzCorpus(args.items, random.Random(args.seed))}
+	corpora.update((name, generateCorpus(name)) for name in CORPORA)
+	failures: list[str] = []
+	slower: list[str] = []
+	print(f"{'corpus':>12} {'minLen':>6} {'reference us':>12} {'scanner us':>10} {'speedup':>7}")
+	for minLen in MIN_LENS:
+		reference = ReferencePipeline(minLen)
+		scanner = NumberScanner(CURRENCY_SYMBOLS, minLen)
+		for corpusName, items in corpora.items():
+			for item in items:
+				expected = reference.process(item)
+				if scanner.process(item) != expected:
+					failures.append(
+						f"{corpusName}, minLen {minLen}: {item!r} gives {scanner.process(item)!r}"
+					)
+			referenceTimes, scannerTimes = timeItems((reference.process, scanner.process), items)
+			# compared round by round, since the speed of a shared machine drifts across rounds
+			speedup = statistics.median(r / s for r, s in zip(referenceTimes, scannerTimes))
+			if speedup < 1:
+				slower.append(f"{corpusName}, minLen {minLen}: scanner slower than the reference pipeline")
+			print(
+				f"{corpusName:>12} {minLen:>6} {min(referenceTimes):>12.2f} {min(scannerTimes):>10.2f} "
+				f"{speedup:>7.2f}",
+			)
+	for failure in failures[:20] + slower:
+		print(f"FAILURE: {failure}")
+	if failures:
+		print(f"{len(failures)} items differ")
+	if failures or slower:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,193 @@
+# Copyright Alberto Buffolino, released under GPL
+# Checks the batch mode of .github/scripts/checkTranslation.py against a local fake Crowdin client, without network:
+# local .po counts, scores equal to those of the per language mode, file list fetched once then cached,
+# and concurrent requests bounded. Reports API calls and time of both modes.
+# Usage: python tools/checkTranslationBatch.py [--languages N] [--files N] [--latency MS] [--max-requests N]
+
+import argparse
+import contextlib
+import io
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / ".github" / "scripts"))
+import checkTranslation  # noqa: E402
+
+PROJECT_ID = 7
+
+
+class FakeCrowdinClient:
+	"""Serves source_files.list_files and translation_status.get_file_progress from memory, with latency."""
+
+	def __init__(self, files: list[str], languages: list[str], latency: float, seed: int = 1):
+		rnd = random.Random(seed)
+		self.files = [{"data": {"id": 1000 + index, "path": path}} for index, path in enumerate(files)]
+		self.progress = {
+			file["data"]["id"]: [
+				{"data": {"languageId": lang, "translationProgress": rnd.randint(0, 100)}}
+				for lang in languages
+			]
+			for file in self.files
+		}
+		self.latency = latency
+		self.calls = {"list_files": 0, "get_file_progress": 0}
+		self.inFlight = self.maxInFlight = 0
+		self.lock = threading.Lock()
+		self.source_files = self
+		self.translation_status = self
+
+	def request(self, name: str, items: list, limit: int, offset: int, total: bool) -> dict:
+		with self.lock:
+			self.calls[name] += 1
+			self.inFlight += 1
+			self.maxInFlight = max(self.maxInFlight, self.inFlight)
+		time.sleep(self.latency)
+		with self.lock:
+			self.inFlight -= 1
+		response = {"data": items[offset : offset + limit]}
+		if total:
+			response["pagination"] = {"offset": offset, "limit": limit, "totalCount": len(items)}
+		return response
+
+	def list_files(self, projectId: int, limit: int, offset: int) -> dict:
+		assert projectId == PROJECT_ID
+		return self.request("list_files", self.files, limit, offset, False)
+
+	def get_file_progress(self, projectId: int, fileId: int, limit: int, offset: int) -> dict:
+		assert projectId == PROJECT_ID
+		return self.request("get_file_progress", self.progress[fileId], limit, offset, True)
+
+	def resetCalls(self):
+		self.calls = dict.fromkeys(self.calls, 0)
+		self.maxInFlight = 0
+
+
+def writePo(path: Path, translated: int, fuzzy: int, empty: int):
+	"""Writes a .po file with the given entries, in a mix of single line, multiline, plural and context forms."""
+	entries = ['msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n']
+	for index in range(translated):
+		if index % 3 == 0:
+			entries.append(f'msgctxt "ctx"\nmsgid ""\n"message {index}"\nmsgstr ""\n"messaggio {index}"\n')
+		elif index % 3 == 1:
+			entries.append(
+				f'msgid "file {index}"\nmsgid_plural "files"\nmsgstr[0] "file"\nmsgstr[1] "files"\n'
+			)
+		else:
+			entries.append(f'#: source.py:{index}\nmsgid "message {index}"\nmsgstr "messaggio {index}"\n')
+	entries += [f'#, fuzzy\nmsgid "fuzzy {index}"\nmsgstr "sfocato {index}"\n' for index in range(fuzzy)]
+	for index in range(empty):
+		if index % 2:
+			entries.append(f'msgid "empty {index}"\nmsgstr ""\n')
+		else:
+			entries.append(f'msgid "half {index}"\nmsgid_plural "halves"\nmsgstr[0] "mezzo"\nmsgstr[1] ""\n')
+	entries.append('#~ msgid "obsolete"\n#~ msgstr "obsoleto"\n')
+	path.parent.mkdir(parents=True, exist_ok=True)
+	path.write_text("\n".join(entries), encoding="utf-8")
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Check the batch translation checker against a fake client.")
+	parser.add_argument("--languages", type=int, default=150, help="languages on the fake project")
+	parser.add_argument("--files", type=int, default=250, help="source files on the fake project")
+	parser.add_argument(
+		"--latency", type=float, default=5.0, help="latency of each fake request in milliseconds"
+	)
+	parser.add_argument("--max-requests", type=int, default=checkTranslation.MAX_REQUESTS)
+	args = parser.parse_args()
+
+	failures: list[str] = []
+	rnd = random.Random(2)
+	workDir = Path(tempfile.mkdtemp(prefix="checkTranslationBatch"))
+	try:
+		# local analysis
+		expected: dict[str, tuple[int, int, int]] = {}
+		for index in range(args.languages):
+			lang = f"l{index:03d}"
+			expected[lang] = (rnd.randint(0, 40), rnd.randint(0, 5), rnd.randint(0, 10))
+			writePo(workDir / "locale" / lang / "LC_MESSAGES" / "nvda.po", *expected[lang])
+		start = time.perf_counter()
+		statsByLang = checkTranslation.analyseLocales([str(workDir / "locale")])
+		print(f"local analysis of {len(statsByLang)} languages: {time.perf_counter() - start:.3f}s")
+		for lang, counts in expected.items():
+			(stats,) = statsByLang[lang]
+			if (stats.translated, stats.fuzzy, stats.empty) != counts:
+				failures.append(f"{lang}: counted {stats[1:]}, expected {counts}")
+
+		# API lookups
+		languages = [f"c{index:03d}-XX" for index in range(args.languages)]
+		files = [f"/addons/addon{index}/addon{index}.pot" for index in range(args.files)]
+		files += ["/addons/myaddon/myAddon.pot", "/addons/myaddon/myAddon.xliff"]
+		client = FakeCrowdinClient(files, languages, args.latency / 1000)
+		fileNames = ["myAddon.po", "myAddon.xliff"]
+		crowdinLangs = [lang[:4] for lang in languages] + ["missing"]
+
+		start = time.perf_counter()
+		# the per language mode prints its lookups
+		with contextlib.redirect_stdout(io.StringIO()):
+			single = {
+				fileName: {
+					lang: checkTranslation.getScore(client, PROJECT_ID, fileName, lang)
+					for lang in crowdinLangs
+				}
+				for fileName in fileNames
+			}
+		singleTime = time.perf_counter() - start
+		singleCalls = dict(client.calls)
+
+		cachePath = workDir / "fileIds.json"
+		timings: list[tuple[str, float, dict[str, int], int]] = []
+		for name in ("batch, cold cache", "batch, warm cache"):
+			client.resetCalls()
+			start = time.perf_counter()
+			batch = checkTranslation.getScoresFromApi(
+				client,
+				PROJECT_ID,
+				fileNames,
+				crowdinLangs,
+				cachePath,
+				args.max_requests,
+			)
+			timings.append((name, time.perf_counter() - start, dict(client.calls), client.maxInFlight))
+			if batch != single:
+				failures.append(f"{name}: scores differ from the per language mode")
+			if client.maxInFlight > args.max_requests:
+				failures.append(f"{name}: {client.maxInFlight} concurrent requests")
+		if timings[0][2]["list_files"] != len(files) // checkTranslation.PAGE_LIMIT + 1:
+			failures.append("batch, cold cache: file list not fetched exactly once")
+		if timings[1][2]["list_files"]:
+			failures.append("batch, warm cache: file list fetched despite cache")
+
+		# a stale cached ID is looked up again
+		checkTranslation.saveFileIds(cachePath, PROJECT_ID, {"myaddon.pot": 1, "myaddon.xliff": 2})
+		if (
+			checkTranslation.getScoresFromApi(client, PROJECT_ID, fileNames, crowdinLangs, cachePath)
+			!= single
+		):
+			failures.append("stale cached file IDs: scores differ")
+
+		print(f"{len(crowdinLangs)} languages, {len(files)} files, {args.latency:.0f}ms per request")
+		print(f"{'mode':>20} {'seconds':>8} {'list_files':>10} {'progress':>9} {'concurrent':>10}")
+		print(
+			f"{'per language':>20} {singleTime:>8.3f} {singleCalls['list_files']:>10} "
+			f"{singleCalls['get_file_progress']:>9} {1:>10}",
+		)
+		for name, seconds, calls, maxInFlight in timings:
+			print(
+				f"{name:>20} {seconds:>8.3f} {calls['list_files']:>10} "
+				f"{calls['get_file_progress']:>9} {maxInFlight:>10}",
+			)
+	finally:
+		shutil.rmtree(workDir)
+	for failure in failures:
+		print(f"FAILURE: {failure}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,208 @@
+# Copyright Alberto Buffolino, released under GPL
+# Minimal stand-ins for the NVDA modules imported by the numberProcessing plugin,
+# so that it can be loaded and timed outside NVDA.
+
+import builtins
+import enum
+import re
+import sys
+import types
+from pathlib import Path
+
+PLUGINS_DIR = Path(__file__).resolve().parents[1] / "addon" / "globalPlugins"
+# modules of the add-on imported by the tools must not leave bytecode in the add-on tree
+sys.dont_write_bytecode = True
+
+
+class _Profile:
+	def __init__(self, name: str | None):
+		self.name = name
+
+
+def _parseDefault(spec: str) -> object:
+	"""Converts the default of a configobj spec, like "integer(default=2)"."""
+	match = re.match(r"(\w+)\(.*default=([^,)]*(?:\(\))?)", spec)
+	if not match:
+		return None
+	kind, value = match.groups()
+	if kind == "boolean":
+		return value.lower() == "true"
+	if kind in ("integer", "float"):
+		return int(value) if kind == "integer" else float(value)
+	if kind.endswith("list"):
+		return []
+	return value.strip("\"'")
+
+
+class _Section(dict[str, object]):
+	"""Config section resolving missing values from spec defaults."""
+
+	def __init__(self, spec: dict[str, str]):
+		super().__init__()
+		self.spec = spec
+
+	def __missing__(self, key: str) -> object:
+		return _parseDefault(self.spec[key])
+
+
+class _Config(dict[str, _Section]):
+	def __init__(self, values: dict[str, dict[str, object]]):
+		super().__init__()
+		self.spec: dict[str, dict[str, str]] = {}
+		self.profiles = [_Profile(None)]
+		self.values = values
+
+	def __missing__(self, key: str) -> _Section:
+		section = self[key] = _Section(self.spec[key])
+		section.update(self.values.get(key, {}))
+		return section
+
+
+class _HandlerRegistrar:
+	"""Stand-in for extensionPoints registrars, applying or notifying handlers in registration order."""
+
+	def __init__(self):
+		self.handlers: list[types.FunctionType] = []
+
+	def register(self, handler: types.FunctionType):
+		if handler not in self.handlers:
+			self.handlers.append(handler)
+
+	def unregister(self, handler: types.FunctionType):
+		if handler in self.handlers:
+			self.handlers.remove(handler)
+
+	def apply(self, value: object) -> object:
+		for handler in self.handlers:
+			value = handler(value)
+		return value
+
+	def notify(self, **kwargs: object):
+		for handler in self.handlers:
+			handler(**kwargs)
+
+
+class _Stub:
+	def __init__(self, *args: object, **kwargs: object):
+		pass
+
+
+class _Region:
+	"""Stand-in for braille.Region, translating each character to a cell of the same character."""
+
+	def __init__(self):
+		self.rawText = ""
+		self.rawTextTypeforms: list[int] | None = None
+		self.cursorPos: int | None = None
+		self.selectionStart: int | None = None
+		self.selectionEnd: int | None = None
+
+	def update(self):
+		self.brailleCells = list(self.rawText)
+		self.rawToBraillePos = list(range(len(self.rawText)))
+		self.brailleToRawPos = list(range(len(self.rawText)))
+		self.brailleCursorPos = self.cursorPos
+		self.brailleSelectionStart = self.brailleSelectionEnd = None
+		if self.selectionStart is not None and self.selectionEnd is not None:
+			self.brailleSelectionStart = self.selectionStart
+			self.brailleSelectionEnd = self.selectionEnd
+
+
+class _Log:
+	def __getattr__(self, name: str):
+		return lambda *args, **kwargs: None
+
+
+def _addModule(name: str, **attributes: object) -> types.ModuleType:
+	module = types.ModuleType(name)
+	module.__dict__.update(attributes)
+	sys.modules[name] = module
+	return module
+
+
+def install(userMinLen: int = 2, autoEnable: bool = False):
+	"""
+	Registers the stand-in modules in sys.modules.
+
+	:param userMinLen: Value of the userMinLen setting.
+	:param autoEnable: Value of the autoEnable setting.
+	"""
+	builtins.__dict__["_"] = lambda text: text
+	conf = _Config({"numberProcessing": {"autoEnable": autoEnable, "userMinLen": userMinLen}})
+	_addModule(
+		"addonHandler",
+		initTranslation=lambda: None,
+		getCodeAddon=lambda: types.SimpleNamespace(manifest={"summary": "Number Processing"}),
+	)
+	_addModule("api", getFocusObject=lambda: None)
+	_addModule("braille", Region=_Region, handler=None)
+	_addModule(
+		"browseMode", BrowseModeDocumentTreeInterceptor=type("BrowseModeDocumentTreeInterceptor", (), {})
+	)
+	_addModule("config", conf=conf, post_configProfileSwitch=_HandlerRegistrar())
+	_addModule(
+		"controlTypes",
+		Role=enum.Enum("Role", "EDITABLETEXT TERMINAL DOCUMENT TABLECELL LISTITEM STATICTEXT"),
+	)
+	_addModule("core", callLater=lambda delay, func, *args: types.SimpleNamespace(Stop=lambda: None))
+	_addModule("globalPluginHandler", GlobalPlugin=_Stub)
+	_addModule("globalVars", appArgs=types.SimpleNamespace(secure=False, configPath="."))
+	settingsDialogs = _addModule(
+		"gui.settingsDialogs",
+		SettingsPanel=_Stub,
+		NVDASettingsDialog=types.SimpleNamespace(categoryClasses=[]),
+	)
+	guiHelper = _addModule("gui.guiHelper")
+	nvdaControls = _addModule("gui.nvdaControls")
+	_addModule("gui", settingsDialogs=settingsDialogs, guiHelper=guiHelper, nvdaControls=nvdaControls)
+	extensions = _addModule(
+		"speech.extensions",
+		filter_speechSequence=_HandlerRegistrar(),
+		speechCanceled=_HandlerRegistrar(),
+	)
+	commands = _addModule(
+		"speech.commands",
+		BaseCallbackCommand=type("BaseCallbackCommand", (_Stub,), {}),
+		BreakCommand=type("BreakCommand", (_Stub,), {}),
+		IndexCommand=type("IndexCommand", (_Stub,), {}),
+		CharacterModeCommand=type("CharacterModeCommand", (_Stub,), {}),
+	)
+	_addModule(
+		"speech", extensions=extensions, commands=commands, speak=lambda sequence, *args, **kwargs: None
+	)
+	_addModule("textInfos", POSITION_CARET="caret", UNIT_CHARACTER="character")
+	_addModule("ui", message=lambda text: None)
+	_addModule("wx", Dialog=_Stub, CallAfter=lambda func, *args: func(*args))
+	_addModule("logHandler", log=_Log())
+	_addModule(
+		"scriptHandler",
+		script=lambda **kwargs: lambda func: func,
+		getLastScriptRepeatCount=lambda: 0,
+	)
+
+
+def configure(plugin: types.ModuleType, **values: object):
+	"""
+	Changes plugin settings and reloads the plugin configuration.
+
+	:param plugin: The plugin module returned by loadPlugin.
+	:param values: New values by setting name, like userMinLen=4.
+	"""
+	sys.modules["config"].conf["numberProcessing"].update(values)
+	plugin.loadConfig()
+
+
+def loadPlugin(userMinLen: int = 2) -> types.ModuleType:
+	"""
+	Imports the plugin module under the stand-ins, with processing enabled.
+
+	:param userMinLen: Minimum number of digits to process individually.
+	:return: The plugin module.
+	"""
+	install(userMinLen=userMinLen)
+	# imported as in NVDA, from the globalPlugins package, for its relative imports
+	sys.path.insert(0, str(PLUGINS_DIR.parent))
+	from globalPlugins import numberProcessing
+
+	numberProcessing.enableProcessing()
+	return numberProcessing
@@ -0,0 +1,101 @@
+# Copyright Alberto Buffolino, released under GPL
+# Replays a speech capture of the numberProcessing plugin outside NVDA,
+# reporting throughput and latency of the speech filter.
+# Usage: python tools/replaySpeechTrace.py <capture.jsonl> [--min-len N] [--repeat N] [--prefetch]
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import nvdaStandIns
+
+
+def loadTrace(path: Path) -> list[list[object]]:
+	"""
+	Reads a capture file, replacing speech commands with stand-in objects of the same type name.
+
+	:param path: Path of the capture file, one JSON array per line.
+	:return: The speech sequences.
+	"""
+	commandTypes: dict[str, type] = {}
+	sequences: list[list[object]] = []
+	with path.open(encoding="utf-8") as f:
+		for line in f:
+			if not line.strip():
+				continue
+			sequence: list[object] = []
+			for item in json.loads(line):
+				if isinstance(item, str):
+					sequence.append(item)
+					continue
+				name = item["type"]
+				if name not in commandTypes:
+					commandTypes[name] = type(name, (), {})
+				sequence.append(commandTypes[name]())
+			sequences.append(sequence)
+	return sequences
+
+
+def percentile(sortedValues: list[int], fraction: float) -> int:
+	"""
+	:param sortedValues: Values in ascending order.
+	:param fraction: Percentile between 0.0 and 1.0.
+	:return: The nearest-rank percentile value.
+	"""
+	index = min(len(sortedValues) - 1, max(0, round(fraction * len(sortedValues)) - 1))
+	return sortedValues[index]
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Replay a numberProcessing speech capture.")
+	parser.add_argument("trace", type=Path, help="capture file written by the plugin")
+	parser.add_argument("--min-len", type=int, default=2, help="minimum number of digits to process")
+	parser.add_argument("--repeat", type=int, default=1, help="number of passes over the capture")
+	parser.add_argument(
+		"--prefetch",
+		action="store_true",
+		help="process strings of the capture in background first, as for a browse mode document",
+	)
+	args = parser.parse_args()
+
+	sequences = loadTrace(args.trace)
+	if not sequences:
+		print("Empty capture.")
+		return
+	plugin = nvdaStandIns.loadPlugin(userMinLen=args.min_len)
+	filterFunc = plugin.filter_numberProcessing
+	if args.prefetch:
+		# the capture itself is the upcoming text
+		plugin.prefetcher.start(plugin.activeRules)
+		plugin.prefetcher.feed([item for sequence in sequences for item in sequence if isinstance(item, str)])
+		plugin.prefetcher.finish()
+	latencies: list[int] = []
+	items = 0
+	chars = 0
+	for _ in range(args.repeat):
+		for sequence in sequences:
+			start = time.perf_counter_ns()
+			filterFunc(sequence)
+			latencies.append(time.perf_counter_ns() - start)
+			items += len(sequence)
+			chars += sum(len(item) for item in sequence if isinstance(item, str))
+	total = sum(latencies) / 1e9
+	latencies.sort()
+	print(f"{len(latencies)} sequences, {items} items, {chars} chars in {total:.3f}s")
+	print(
+		f"throughput: {len(latencies) / total:.0f} sequences/s, "
+		f"{items / total:.0f} items/s, {chars / total:.0f} chars/s",
+	)
+	print(
+		"latency (us): "
+		+ ", ".join(
+			f"{label} {percentile(latencies, fraction) / 1000:.1f}"
+			for label, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+		),
+	)
+	print(f"transform cache: {plugin.transformCache.getStats()}")
+
+
+if __name__ == "__main__":
+	main()